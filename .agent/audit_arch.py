@@ -1,8 +1,11 @@
 import os
 import ast
 import sys
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 # Definición de reglas de arquitectura (Quién NO puede importar a Quién)
 # Formato: 'capa_origen': ['capa_prohibida1', 'capa_prohibida2']
@@ -12,16 +15,53 @@ FORBIDDEN_IMPORTS = {
     # 'app/services': [], 
 }
 
-def get_imports(file_path: str) -> List[str]:
-    """Extrae todos los imports de un archivo Python"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        try:
-            tree = ast.parse(f.read(), filename=file_path)
-        except SyntaxError:
-            return []
+# Prefijos prohibidos como tupla: str.startswith acepta tuplas y evalúa todo en C
+FORBIDDEN_BY_LAYER = {layer: tuple(prefixes) for layer, prefixes in FORBIDDEN_IMPORTS.items()}
+
+# Pares (capa, módulo) para el caso común de importar exactamente el módulo prohibido
+FORBIDDEN_SET = frozenset(
+    (layer, prefix) for layer, prefixes in FORBIDDEN_IMPORTS.items() for prefix in prefixes
+)
+
+# Caché en disco de imports por archivo (clave: SHA-256 del fuente + versión de Python
+# + versión del extractor, para invalidar entradas si cambia qué imports se recogen)
+CACHE_DIR = Path(__file__).resolve().parent / '.audit_cache'
+_EXTRACTOR_VERSION = 2
+_CACHE_SALT = f"{sys.version_info.major}.{sys.version_info.minor}:{_EXTRACTOR_VERSION}".encode()
+
+# Paralelismo: (file_path, rel_path, capa, fuente, archivo de caché) por archivo a
+# parsear; fuente y ruta de caché ya calculadas al sondear la caché
+WorkItem = Tuple[str, str, str, bytes, Path]
+PARALLEL_MIN_FILES = 64
+
+def _top_level_nodes(tree: ast.Module) -> Iterator[ast.stmt]:
+    """
+    Sentencias a nivel de módulo, bajando un nivel en `if`/`try`
+    (ej. `if TYPE_CHECKING:` o `try: import x except ImportError`).
+
+    Los imports locales dentro de funciones no cuentan para la arquitectura.
+    """
+    for node in tree.body:
+        yield node
+        if isinstance(node, ast.If):
+            yield from node.body
+            yield from node.orelse
+        elif isinstance(node, ast.Try):
+            yield from node.body
+            for handler in node.handlers:
+                yield from handler.body
+            yield from node.orelse
+            yield from node.finalbody
+
+def _parse_imports(source: bytes, filename: str) -> List[str]:
+    """Parsea el fuente y extrae los módulos importados"""
+    try:
+        tree = ast.parse(source, filename=filename)
+    except SyntaxError:
+        return []
 
     imports = []
-    for node in ast.walk(tree):
+    for node in _top_level_nodes(tree):
         if isinstance(node, ast.Import):
             for n in node.names:
                 imports.append(n.name)
@@ -30,40 +70,139 @@ def get_imports(file_path: str) -> List[str]:
                 imports.append(node.module)
     return imports
 
+def _cache_file_for(source: bytes) -> Path:
+    """Ruta del archivo de caché para un fuente dado"""
+    return CACHE_DIR / f"{hashlib.sha256(_CACHE_SALT + source).hexdigest()}.json"
+
+def _read_cache(cache_file: Path) -> Optional[List[str]]:
+    """Leer imports cacheados; None si no hay entrada válida"""
+    try:
+        return json.loads(cache_file.read_text(encoding='utf-8'))['imports']
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _write_cache(cache_file: Path, imports: List[str]) -> None:
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        cache_file.write_text(json.dumps({'imports': imports}), encoding='utf-8')
+    except OSError:
+        # La caché es opcional: si no se puede escribir, seguimos sin ella
+        pass
+
+def _read_source(file_path: str) -> bytes:
+    """Leer el fuente como bytes (ast.parse resuelve el encoding) sin la capa de I/O con buffer"""
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        while True:
+            chunk = os.read(fd, max(size, 1))
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b''.join(chunks)
+    finally:
+        os.close(fd)
+
+def get_imports_cached(file_path: str) -> List[str]:
+    """Extrae los imports de un archivo reutilizando la caché si el fuente no cambió"""
+    source = _read_source(file_path)
+    cache_file = _cache_file_for(source)
+
+    imports = _read_cache(cache_file)
+    if imports is None:
+        imports = _parse_imports(source, file_path)
+        _write_cache(cache_file, imports)
+    return imports
+
+def get_imports(file_path: str) -> List[str]:
+    """Extrae todos los imports de un archivo Python"""
+    return get_imports_cached(file_path)
+
+def iter_py_files(root: str) -> Iterator[str]:
+    """Recorre `root` con os.scandir (pila explícita) y devuelve rutas de archivos .py"""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.py') and entry.is_file(follow_symlinks=False):
+                    yield entry.path
+
+def _layer_for(rel_path: str) -> Optional[str]:
+    """Capa de un archivo: las reglas se indexan por 'app/<capa>', lookup O(1) en el dict"""
+    parts = rel_path.split('/', 2)
+    if len(parts) < 3:
+        return None
+    layer = f"{parts[0]}/{parts[1]}"
+    return layer if layer in FORBIDDEN_IMPORTS else None
+
+def _find_violations(rel_path: str, layer: str, file_imports: List[str]) -> List[str]:
+    """Comparar los imports de un archivo contra las reglas de su capa"""
+    violations = []
+    forbidden_tuple = FORBIDDEN_BY_LAYER[layer]
+    
+    for imp in file_imports:
+        if (layer, imp) in FORBIDDEN_SET:
+            violations.append(
+                f"❌ VIOLACIÓN: '{rel_path}' (Capa: {layer}) "
+                f"importa '{imp}' (Prohibido: {imp})"
+            )
+            continue
+        if not imp.startswith(forbidden_tuple):
+            continue
+        # Solo ante un match buscamos qué prefijo concreto lo causó (para el mensaje)
+        for forbidden in forbidden_tuple:
+            if imp.startswith(forbidden):
+                violations.append(
+                    f"❌ VIOLACIÓN: '{rel_path}' (Capa: {layer}) "
+                    f"importa '{imp}' (Prohibido: {forbidden})"
+                )
+    return violations
+
+def _check_one_file(item: WorkItem) -> List[str]:
+    """Worker: parsear un archivo (sin caché válida) y devolver sus violaciones"""
+    file_path, rel_path, layer, source, cache_file = item
+    imports = _parse_imports(source, file_path)
+    _write_cache(cache_file, imports)
+    return _find_violations(rel_path, layer, imports)
+
 def check_architecture(root_dir: str) -> List[str]:
     violations = []
+    cwd = os.getcwd()
+    pending: List[WorkItem] = []
+    
+    for file_path in iter_py_files(root_dir):
+        # Normalizar path para comparar con reglas
+        rel_path = os.path.relpath(file_path, cwd).replace('\\', '/')
+        
+        # Determinar en qué capa estamos
+        current_layer = _layer_for(rel_path)
+        if not current_layer:
+            continue
+        
+        # Archivos sin cambios se resuelven desde la caché, sin pasar por el pool;
+        # los demás llevan el fuente ya leído y hasheado (el worker solo parsea)
+        source = _read_source(file_path)
+        cache_file = _cache_file_for(source)
+        cached = _read_cache(cache_file)
+        if cached is not None:
+            violations.extend(_find_violations(rel_path, current_layer, cached))
+        else:
+            pending.append((file_path, rel_path, current_layer, source, cache_file))
+    
+    # Pocos archivos: el arranque de procesos cuesta más que parsearlos en serie
+    if len(pending) < PARALLEL_MIN_FILES:
+        for item in pending:
+            violations.extend(_check_one_file(item))
+        return violations
     
-    for root, _, files in os.walk(root_dir):
-        for file in files:
-            if not file.endswith('.py'):
-                continue
-                
-            file_path = os.path.join(root, file)
-            # Normalizar path para comparar con reglas
-            rel_path = os.path.relpath(file_path, os.getcwd()).replace('\\', '/')
-            
-            # Determinar en qué capa estamos
-            current_layer = None
-            for layer in FORBIDDEN_IMPORTS.keys():
-                if rel_path.startswith(layer):
-                    current_layer = layer
-                    break
-            
-            if not current_layer:
-                continue
-                
-            # Chequear imports del archivo
-            file_imports = get_imports(file_path)
-            forbidden_list = FORBIDDEN_IMPORTS[current_layer]
-            
-            for imp in file_imports:
-                for forbidden in forbidden_list:
-                    if imp.startswith(forbidden):
-                        violations.append(
-                            f"❌ VIOLACIÓN: '{rel_path}' (Capa: {current_layer}) "
-                            f"importa '{imp}' (Prohibido: {forbidden})"
-                        )
-                        
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for file_violations in executor.map(_check_one_file, pending, chunksize=32):
+            violations.extend(file_violations)
+                    
     return violations
 
 if __name__ == "__main__":
@@ -1,16 +1,20 @@
 """
 Endpoints de administración (requieren Master API Key).
 """
+import asyncio
 import logging
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException, status, Depends
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 
 from app.services.admin.create_user import CreateUserService
 from app.services.admin.update_user_plan import UpdateUserPlanService
 from app.services.admin.block_user import BlockUserService
-from app.infra.user_repository import UserRepository
-from app.infra.plan_repository import PlanRepository
+from app.services.cost_monitoring import CostMonitoringService
+from app.infra.user_repository import get_user_repository
+from app.infra.plan_repository import get_plan_repository
+from app.models.requests import REQUEST_MODEL_CONFIG
 from app.dependencies.auth import require_master_key
 
 router = APIRouter()
@@ -19,16 +23,22 @@ logger = logging.getLogger(__name__)
 
 # Request/Response Models
 class CreateUserRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     email: EmailStr
     plan_name: str = "free"
     webhook_url: Optional[str] = None
 
 
 class UpdatePlanRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     plan_name: str
 
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     user_id: str
     email: str
     plan: str
@@ -40,20 +50,20 @@ class UserResponse(BaseModel):
 # Dependency Injection
 def get_create_user_service() -> CreateUserService:
     return CreateUserService(
-        user_repo=UserRepository(),
-        plan_repo=PlanRepository(),
+        user_repo=get_user_repository(),
+        plan_repo=get_plan_repository(),
     )
 
 
 def get_update_plan_service() -> UpdateUserPlanService:
     return UpdateUserPlanService(
-        user_repo=UserRepository(),
-        plan_repo=PlanRepository(),
+        user_repo=get_user_repository(),
+        plan_repo=get_plan_repository(),
     )
 
 
 def get_block_user_service() -> BlockUserService:
-    return BlockUserService(user_repo=UserRepository())
+    return BlockUserService(user_repo=get_user_repository())
 
 
 # Endpoints
@@ -67,14 +77,17 @@ async def create_user(
     Crear un nuevo usuario con un plan específico.
     Requiere Master API Key.
     """
+    # EmailStr ya validó el formato en el boundary; hacia abajo viaja como str
+    email = str(payload.email)
     try:
-        result = service.execute(
-            email=payload.email,
+        result = await asyncio.to_thread(
+            service.execute,
+            email=email,
             plan_name=payload.plan_name,
             webhook_url=payload.webhook_url,
         )
         
-        logger.info(f"User created: {result['user_id']} ({payload.email})")
+        logger.info(f"User created: {result['user_id']} ({email})")
         
         return UserResponse(
             user_id=result["user_id"],
@@ -106,7 +119,7 @@ async def update_user_plan(
     """
     
     try:
-        result = service.execute(user_id, payload.plan_name)
+        result = await asyncio.to_thread(service.execute, user_id, payload.plan_name)
         logger.info(f"User plan updated: {user_id} -> {payload.plan_name}")
         return result
     
@@ -130,7 +143,7 @@ async def block_user(
     """
     
     try:
-        result = service.execute(user_id, block=True)
+        result = await asyncio.to_thread(service.execute, user_id, block=True)
         logger.info(f"User blocked: {user_id}")
         return result
     
@@ -154,7 +167,7 @@ async def unblock_user(
     """
     
     try:
-        result = service.execute(user_id, block=False)
+        result = await asyncio.to_thread(service.execute, user_id, block=False)
         logger.info(f"User unblocked: {user_id}")
         return result
     
@@ -167,6 +180,12 @@ async def unblock_user(
 
 
 # Cost Monitoring Endpoints
+@lru_cache(maxsize=1)
+def _cost_monitor() -> CostMonitoringService:
+    """CostMonitoringService compartido entre requests"""
+    return CostMonitoringService()
+
+
 @router.get("/cost-dashboard")
 async def get_cost_dashboard(
     days: int = 7,
@@ -176,19 +195,15 @@ async def get_cost_dashboard(
     Get comprehensive cost dashboard.
     Requires Master API Key.
     """
-    from app.services.cost_monitoring import CostMonitoringService
-    
-    cost_monitor = CostMonitoringService()
+    cost_monitor = _cost_monitor()
     
-    # Gemini costs
-    daily_costs = await cost_monitor.get_daily_costs(days=min(days, 7))
-    monthly_costs = await cost_monitor.get_daily_costs(days=30)
-    
-    # MongoDB storage
-    storage_stats = await cost_monitor.get_storage_stats()
-    
-    # Budget alerts
-    alerts = await cost_monitor.check_budget_alerts()
+    # Gemini costs, MongoDB storage y budget alerts son consultas independientes
+    daily_costs, monthly_costs, storage_stats, alerts = await asyncio.gather(
+        asyncio.to_thread(cost_monitor.get_daily_costs, days=min(days, 7)),
+        asyncio.to_thread(cost_monitor.get_daily_costs, days=30),
+        asyncio.to_thread(cost_monitor.get_storage_stats),
+        asyncio.to_thread(cost_monitor.check_budget_alerts),
+    )
     
     return {
         "gemini": {
@@ -208,10 +223,7 @@ async def get_storage_stats(_: str = Depends(require_master_key)):
     Get MongoDB storage statistics.
     Requires Master API Key.
     """
-    from app.services.cost_monitoring import CostMonitoringService
-    
-    cost_monitor = CostMonitoringService()
-    return await cost_monitor.get_storage_stats()
+    return await asyncio.to_thread(_cost_monitor().get_storage_stats)
 
 
 @router.get("/user-costs/{user_id}")
@@ -224,8 +236,5 @@ async def get_user_costs(
     Get cost breakdown for a specific user.
     Requires Master API Key.
     """
-    from app.services.cost_monitoring import CostMonitoringService
-    
-    cost_monitor = CostMonitoringService()
-    return await cost_monitor.get_user_costs(user_id, days)
+    return await asyncio.to_thread(_cost_monitor().get_user_costs, user_id, days)
 
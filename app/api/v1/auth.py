@@ -1,27 +1,49 @@
 """
 Authentication endpoints.
 """
+import asyncio
 import logging
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException, status, Depends, Request
 from pydantic import BaseModel
 from typing import Dict
 
 from app.services.verify_otp import VerifyOTPService
 from app.services.refresh_token import RefreshTokenService
-from app.infra.otp_repository import OTPRepository
-from app.infra.user_repository import UserRepository
-from app.dependencies.auth import require_user_key
+from app.infra.otp_repository import get_otp_repository
+from app.infra.user_repository import get_user_repository
+from app.models.requests import REQUEST_MODEL_CONFIG
+from app.dependencies.auth import AuthContext, require_user_key
+from app.dependencies.admission import admission_control
 from app.services.generate_otp import GenerateOTPService
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+# Services are stateless wrappers around the shared repositories: build them once
+@lru_cache(maxsize=1)
+def get_generate_otp_service() -> GenerateOTPService:
+    return GenerateOTPService(otp_repo=get_otp_repository(), user_repo=get_user_repository())
+
+
+@lru_cache(maxsize=1)
+def get_verify_otp_service() -> VerifyOTPService:
+    return VerifyOTPService(otp_repo=get_otp_repository(), user_repo=get_user_repository())
+
+
+@lru_cache(maxsize=1)
+def get_refresh_token_service() -> RefreshTokenService:
+    return RefreshTokenService(get_user_repository())
+
+
 class LoginRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     api_key: str
 
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(admission_control("otp"))])
 async def login(request: LoginRequest, req: Request):
     """
     Initiate login by generating and sending OTP.
@@ -38,8 +60,8 @@ async def login(request: LoginRequest, req: Request):
         logger.info(f"Login attempt with API key: {request.api_key[:15]}...")
         
         # Validate API key directly
-        user_repo = UserRepository()
-        user = user_repo.get_by_api_key(request.api_key)
+        user_repo = get_user_repository()
+        user = await user_repo.get_by_api_key_async(request.api_key)
         
         if not user:
             logger.warning(f"Invalid API key attempted: {request.api_key[:15]}...")
@@ -50,11 +72,9 @@ async def login(request: LoginRequest, req: Request):
         
         logger.info(f"Valid API key for user: {user.id}")
         
-        # Check per-user OTP rate limit (3 per hour)
-        otp_repo = OTPRepository()
-        recent_otps = otp_repo.count_recent_otps(user.id, hours=1)
-        
-        if recent_otps >= 3:
+        # Check per-user OTP rate limit (3 per hour), atomically reserving a slot
+        otp_repo = get_otp_repository()
+        if not await otp_repo.consume_otp_quota_async(user.id, limit=3, hours=1):
             logger.warning(f"User {user.id} exceeded OTP rate limit")
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -62,12 +82,15 @@ async def login(request: LoginRequest, req: Request):
             )
         
         # Generate OTP
-        service = GenerateOTPService(
-            otp_repo=otp_repo,
-            user_repo=user_repo
-        )
+        service = get_generate_otp_service()
+        
+        try:
+            result = await service.execute(user.id)
+        except Exception:
+            # No OTP was issued: give the reserved slot back
+            await otp_repo.release_otp_quota_async(user.id)
+            raise
         
-        result = await service.execute(user.id)
         logger.info(f"OTP generated successfully for user: {user.id}")
         
         return {
@@ -94,11 +117,16 @@ async def login(request: LoginRequest, req: Request):
 
 
 class VerifyOTPRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     code: str
 
 
-@router.post("/request-otp")
-async def request_otp(user: dict = Depends(require_user_key)):
+@router.post("/request-otp", dependencies=[Depends(admission_control("otp"))])
+async def request_otp(
+    user: AuthContext = Depends(require_user_key),
+    service: GenerateOTPService = Depends(get_generate_otp_service),
+):
     """
     Request OTP code for authentication.
     Generates a 6-digit OTP and sends it to the user's email.
@@ -110,12 +138,7 @@ async def request_otp(user: dict = Depends(require_user_key)):
     """
     
     try:
-        service = GenerateOTPService(
-            otp_repo=OTPRepository(),
-            user_repo=UserRepository()
-        )
-        
-        result = await service.execute(user["user_id"])
+        result = await service.execute(user.user_id)
         
         return {
             "message": result["message"],
@@ -140,7 +163,8 @@ async def request_otp(user: dict = Depends(require_user_key)):
 @router.post("/verify-otp")
 async def verify_otp(
     request: VerifyOTPRequest,
-    user: dict = Depends(require_user_key)
+    user: AuthContext = Depends(require_user_key),
+    service: VerifyOTPService = Depends(get_verify_otp_service),
 ):
     """
     Verify OTP code and issue JWT tokens.
@@ -148,20 +172,16 @@ async def verify_otp(
     Requires User API Key to identify the user trying to login.
     """
     try:
-        service = VerifyOTPService(
-            otp_repo=OTPRepository(),
-            user_repo=UserRepository()
-        )
-        
-        result = service.execute(
-            user_id=user["user_id"],
+        result = await asyncio.to_thread(
+            service.execute,
+            user_id=user.user_id,
             code=request.code
         )
         
         return result
         
     except ValueError as e:
-        logger.warning(f"OTP verification failed for user {user['user_id']}: {e}")
+        logger.warning(f"OTP verification failed for user {user.user_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e)
@@ -176,12 +196,15 @@ async def verify_otp(
 
 class RefreshTokenRequest(BaseModel):
     """Modelo para solicitar refresco de token"""
+    model_config = REQUEST_MODEL_CONFIG
+
     refresh_token: str
 
 
 @router.post("/refresh")
 async def refresh_token(
     request: RefreshTokenRequest,
+    service: RefreshTokenService = Depends(get_refresh_token_service),
 ):
     """
     Renueva el Access Token usando un Refresh Token válido.
@@ -193,10 +216,7 @@ async def refresh_token(
         JSON con nuevo access_token
     """
     try:
-        # Resolve dependency manually since we don't have it in Depends yet
-        user_repo = UserRepository()
-        service = RefreshTokenService(user_repo)
-        return service.execute(request.refresh_token)
+        return await asyncio.to_thread(service.execute, request.refresh_token)
     except ValueError as e:
         raise HTTPException(status_code=401, detail=str(e))
     except Exception as e:
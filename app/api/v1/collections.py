@@ -1,12 +1,14 @@
+import asyncio
 import logging
 
-from fastapi import APIRouter, Header, HTTPException, status, Depends, Query, UploadFile, File, Form, Request
-from typing import Optional
-import json
+from fastapi import APIRouter, Header, HTTPException, status, Depends, Query, UploadFile, File, Form
+from fastapi.responses import ORJSONResponse
+from typing import Optional, Tuple
 
-from app.config import settings
-from app.infra.gemini_embeddings import GeminiEmbeddingProvider
-from app.infra.gemini_llm import GeminiLLMProvider
+import orjson
+
+from app.infra.gemini_embeddings import get_embedding_provider
+from app.infra.gemini_llm import get_llm_provider
 from app.models.requests import InsertCollectionRequest, CollectionQueryRequest, CollectionIngestRequest
 from app.services.insert_collection import InsertCollectionService
 from app.services.upsert_document import UpsertDocumentService
@@ -18,15 +20,14 @@ from app.services.rag_ingest import RagIngestService
 from app.services.rag_query import RagQueryService
 from app.strategies.pdf_ingest_strategy import PdfIngestStrategy
 from app.strategies.text_ingest_strategy import TextIngestStrategy
-from app.infra.user_repository import UserRepository
-from app.infra.plan_repository import PlanRepository
+from app.infra.user_repository import UserRepository, get_user_repository
+from app.infra.plan_repository import PlanRepository, get_plan_repository
 from app.dependencies.project import get_project_context
-from app.domain.entities import Project
+from app.domain.entities import Plan, Project, User
 
 router = APIRouter()
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 def get_insert_collection_service() -> InsertCollectionService:
     return InsertCollectionService()
@@ -77,7 +78,7 @@ def get_collection(
     service: GetCollectionService = Depends(get_get_collection_service),
 ):
     try:
-        return service.execute(
+        result = service.execute(
             project=project,
             collection=collection,
             limit=limit,
@@ -87,6 +88,9 @@ def get_collection(
         raise HTTPException(status_code=401, detail="Invalid API Key")
     except RuntimeError:
         raise HTTPException(status_code=410, detail="Project expired")
+    # El servicio ya construye ListDocumentsResponse: se serializa directo con orjson
+    # en lugar de re-validarlo contra response_model
+    return ORJSONResponse(content=result.model_dump())
 
 
 @router.get("/{collection}/{document_id}")
@@ -156,17 +160,29 @@ def delete_document(
         raise HTTPException(status_code=410, detail="Project expired")
 
 
+# Providers de Gemini: una instancia por proceso (api_key no cambia en runtime)
+# para reutilizar el cliente HTTP y sus conexiones entre requests.
 def get_rag_ingest_service() -> RagIngestService:
     return RagIngestService(
-        embedding_provider=GeminiEmbeddingProvider(settings.gemini_api_key),
+        embedding_provider=get_embedding_provider(),
     )
 
 def get_rag_query_service() -> RagQueryService:
     return RagQueryService(
-        embedding_provider=GeminiEmbeddingProvider(settings.gemini_api_key),
-        llm_provider=GeminiLLMProvider(settings.gemini_api_key),
+        embedding_provider=get_embedding_provider(),
+        llm_provider=get_llm_provider(),
     )
 
+
+def _load_user_and_plan(
+    user_repo: UserRepository,
+    plan_repo: PlanRepository,
+    user_id: str,
+) -> Tuple[User, Optional[Plan]]:
+    """Lookups síncronos (pymongo) de usuario y plan; se ejecuta fuera del event loop"""
+    user = user_repo.get_by_id_cached(user_id)
+    return user, plan_repo.get_by_name(user.plan_name)
+
 @router.post(
     "/{collection}/ingest",
     status_code=status.HTTP_202_ACCEPTED  # Changed from 201 to 202 (Accepted)
@@ -174,7 +190,9 @@ def get_rag_query_service() -> RagQueryService:
 async def collection_ingest(
     collection: str,
     payload: CollectionQueryRequest,
-    request: Request,
+    project: Project = Depends(get_project_context),
+    user_repo: UserRepository = Depends(get_user_repository),
+    plan_repo: PlanRepository = Depends(get_plan_repository),
 ):
     """
     Ingesta de texto plano (asíncrono con jobs).
@@ -193,17 +211,11 @@ async def collection_ingest(
     """
     logger.info(f"📝 Text ingest requested for collection '{collection}'")
     
-    # Obtener project context
-    project = await get_project_context(request)
     project_id = project.id
     user_id = project.user_id
     
-    # Obtener usuario y plan
-    user_repo = UserRepository()
-    user = user_repo.get_by_id(user_id)
-    
-    plan_repo = PlanRepository()
-    plan = plan_repo.get_by_name(user.plan_name)
+    # Obtener usuario y plan (cacheados: aquí solo se lee el plan)
+    user, plan = await asyncio.to_thread(_load_user_and_plan, user_repo, plan_repo, user_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -259,11 +271,13 @@ async def collection_ingest(
 )
 async def ingest_files(
     collection: str,
-    request: Request,
     file: UploadFile = File(...),
     metadata: Optional[str] = Form(None),
     document_id: Optional[str] = Form(None),
     chunk_size: int = Form(500),
+    project: Project = Depends(get_project_context),
+    user_repo: UserRepository = Depends(get_user_repository),
+    plan_repo: PlanRepository = Depends(get_plan_repository),
 ):
     """
     Ingesta de archivos (PDFs).
@@ -276,66 +290,23 @@ async def ingest_files(
     
     Requiere Project API Key o JWT + Project Context.
     """
-    # Obtener información del middleware
-    # CONTEXT REF: Hemos migrado a get_project_context, pero este endpoint es complejo
-    # porque usa UploadFile y Form, lo que complica usar validación de header estandar.
-    # Sin embargo, el Request ya tiene state.project_id si se usó Key en middleware?
-    # NO. Middleware solo verifica, no inyecta dependencia.
-    
-    # Resolver proyecto manualmente (ya que Depends no funciona con Form/UploadFile combinado)
-    from app.infra.project_repository import ProjectRepository
-    
-    x_api_key = request.headers.get("X-API-Key")
-    if not x_api_key:
-        raise HTTPException(status_code=401, detail="X-API-Key header required")
-    
-    project_repo = ProjectRepository()
-    project = project_repo.get_by_api_key(x_api_key)
-    if not project:
-        raise HTTPException(status_code=401, detail="Invalid API Key")
-    
-    # Check expiry
-    if project.expires_at:
-        expires = project.expires_at
-        if expires.tzinfo is None:
-            from datetime import timezone
-            expires = expires.replace(tzinfo=timezone.utc)
-        from datetime import datetime, timezone
-        if expires < datetime.now(timezone.utc):
-            raise HTTPException(status_code=410, detail="Project expired")
-    
     project_id = project.id
     user_id = project.user_id
-
-    # user = request.state.user ?? No, get_project_context guarantees project access
-    
-    # Necesitamos el User entity para el rate limit. 
-    # Project entity tiene user_id. 
-    user_repo = UserRepository()
-    user = user_repo.get_by_id(user_id)
     
-    # Obtener plan del usuario
-    plan_repo = PlanRepository()
-    plan = plan_repo.get_by_name(user.plan_name)
-    if not plan:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Plan configuration not found"
-        )
-    
-    # Validar extensión
-    if not file.filename.lower().endswith('.pdf'):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only PDF files are supported. Filename must end with .pdf"
-        )
+    # Necesitamos el User entity y su plan para el rate limit. 
+    # Project entity tiene user_id. El lookup (plan depende de user.plan_name)
+    # corre en un thread mientras se parsea metadata y se arma la strategy
+    lookup = asyncio.create_task(
+        asyncio.to_thread(_load_user_and_plan, user_repo, plan_repo, user_id)
+    )
     
     # Parsear metadata
     parsed_metadata = {}
     if metadata:
         try:
-            parsed_metadata = json.loads(metadata)
-        except json.JSONDecodeError:
+            parsed_metadata = orjson.loads(metadata)
+        except orjson.JSONDecodeError:
+            lookup.cancel()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid metadata JSON"
@@ -344,8 +315,15 @@ async def ingest_files(
     # Usar PdfIngestStrategy
     strategy = PdfIngestStrategy()
     
+    user, plan = await lookup
+    if not plan:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Plan configuration not found"
+        )
+    
     try:
-        # Validar según límites del plan
+        # Validar extensión y límites del plan (firma %PDF: durante la copia)
         await strategy.validate(user, plan, file)
         
         # Procesar PDF (pasar plan para metadata)
@@ -393,7 +371,14 @@ async def collection_query(
     service: RagQueryService = Depends(get_rag_query_service),
 ):
     logger.info(f"RAG query requested for collection '{collection}'")
-    logger.debug(f"Query Payload: {payload.model_dump_json()}")
+    # Serializar el payload solo si DEBUG está activo (el f-string lo haría siempre)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Query Payload: %s", payload.model_dump_json())
+
+    # Una query vacía no llega al batcher de embeddings (donde podría hacer
+    # fallar el lote de otros proyectos)
+    if not payload.query.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
 
     try:
         result = await service.execute(
@@ -3,13 +3,15 @@ API endpoints para consulta de Jobs.
 """
 import logging
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 
 from app.services.get_job_status import GetJobStatusService
 from app.services.list_user_jobs import ListUserJobsService
 from app.services.list_project_jobs import ListProjectJobsService
-from app.infra.job_repository import JobRepository
-from app.dependencies.auth import require_user_or_project_key
+from app.infra.job_repository import get_job_repository
+from app.dependencies.auth import KeyAuthContext, require_user_or_project_key
+from app.dependencies.params import JobIdPath
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -17,23 +19,23 @@ logger = logging.getLogger(__name__)
 
 # Dependency Injection
 def get_job_status_service() -> GetJobStatusService:
-    return GetJobStatusService(job_repo=JobRepository())
+    return GetJobStatusService(job_repo=get_job_repository())
 
 
 def get_list_user_jobs_service() -> ListUserJobsService:
-    return ListUserJobsService(job_repo=JobRepository())
+    return ListUserJobsService(job_repo=get_job_repository())
 
 
 def get_list_project_jobs_service() -> ListProjectJobsService:
-    return ListProjectJobsService(job_repo=JobRepository())
+    return ListProjectJobsService(job_repo=get_job_repository())
 
 
 # Endpoints
 @router.get("/{job_id}")
 async def get_job_status(
-    job_id: str,
+    job_id: JobIdPath,
     service: GetJobStatusService = Depends(get_job_status_service),
-    auth: dict = Depends(require_user_or_project_key),
+    auth: KeyAuthContext = Depends(require_user_or_project_key),
 ):
     """
     Obtener estado de un job de procesamiento.
@@ -41,10 +43,10 @@ async def get_job_status(
     Requiere autenticación (User o Project API Key).
     Solo puede ver jobs propios.
     """
-    user_id = auth["user_id"]
+    user_id = auth.user_id
     
     try:
-        result = service.execute(job_id=job_id, user_id=user_id)
+        result = await service.execute_async(job_id=job_id, user_id=user_id)
         return result
     
     except ValueError as e:
@@ -72,7 +74,7 @@ async def list_user_jobs(
     limit: int = 10,
     status_filter: Optional[str] = None,
     service: ListUserJobsService = Depends(get_list_user_jobs_service),
-    auth: dict = Depends(require_user_or_project_key),
+    auth: KeyAuthContext = Depends(require_user_or_project_key),
 ):
     """
     Listar jobs del usuario autenticado.
@@ -81,15 +83,16 @@ async def list_user_jobs(
     - limit: Número máximo de jobs (default: 10, max: 50)
     - status: Filtrar por estado (queued, processing, completed, failed)
     """
-    user_id = auth["user_id"]
+    user_id = auth.user_id
     
     try:
-        result = service.execute(
+        result = await service.execute_async(
             user_id=user_id,
             limit=limit,
             status_filter=status_filter
         )
-        return result
+        # Respuesta directa: evita el paso de jsonable_encoder sobre la lista
+        return ORJSONResponse(content=result)
     
     except ValueError as e:
         logger.warning(f"Failed to list jobs: {e}")
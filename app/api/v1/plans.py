@@ -1,16 +1,24 @@
 """
 Endpoints públicos de planes (no requieren autenticación).
 """
+import asyncio
+import hashlib
 import logging
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import List
+from typing import Any, List, Optional
 
-from app.infra.plan_repository import PlanRepository
+import orjson
+
+from app.infra.plan_repository import PlanRepository, get_plan_repository
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Los planes casi nunca cambian: navegadores y CDN pueden cachearlos
+PLANS_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
+
 
 # Response Models
 class PlanLimitsResponse(BaseModel):
@@ -31,44 +39,101 @@ class PlanResponse(BaseModel):
     features: List[str]
 
 
+def _to_response(plan) -> dict:
+    """
+    Mapear entidad Plan al dict de respuesta (misma forma que PlanResponse).
+    
+    Se arma el dict directamente: el body lo serializa orjson, sin pasar por Pydantic.
+    """
+    return {
+        "name": plan.name,
+        "display_name": plan.display_name,
+        "price_usd": float(plan.price_usd),
+        "limits": {
+            "projects": plan.projects_limit,
+            "reads_per_month": plan.reads_limit,
+            "writes_per_month": plan.writes_limit,
+            "rag_queries_per_month": plan.rag_queries_limit,
+            "pdf_max_size_mb": plan.pdf_max_size_mb,
+            "retention_hours": plan.retention_hours,
+            "audit_retention_days": plan.audit_retention_days,
+        },
+        "features": plan.features,
+    }
+
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """
+    Comprobar If-None-Match contra el ETag (comparación débil, RFC 9110).
+    
+    El header puede traer "*" o una lista separada por comas; el prefijo W/
+    no cuenta al comparar.
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in tags:
+        return True
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def _cacheable_response(request: Request, content: Any) -> Response:
+    """
+    Respuesta con Cache-Control y ETag (hash del contenido).
+    
+    Si el cliente ya tiene esa versión (If-None-Match), responde 304 sin body.
+    """
+    body = orjson.dumps(content)
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {"Cache-Control": PLANS_CACHE_CONTROL, "ETag": etag}
+    
+    if _etag_matches(etag, request.headers.get("if-none-match")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=body, media_type=ORJSONResponse.media_type, headers=headers)
+
+
 # Endpoints
-@router.get("", response_model=List[PlanResponse])
-async def list_plans():
+# Los handlers devuelven el body ya serializado (Response): el modelo solo
+# documenta la respuesta en OpenAPI, no se valida ni filtra con él
+@router.get(
+    "",
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": List[PlanResponse]}},
+)
+async def list_plans(
+    request: Request,
+    plan_repo: PlanRepository = Depends(get_plan_repository),
+):
     """
     Listar todos los planes disponibles.
     Endpoint público (no requiere autenticación).
     """
-    plan_repo = PlanRepository()
-    plans = plan_repo.get_all()
+    # Con la caché caliente se evita el salto a un thread
+    plans = plan_repo.get_all_cached()
+    if plans is None:
+        plans = await asyncio.to_thread(plan_repo.get_all)
     
-    return [
-        PlanResponse(
-            name=plan.name,
-            display_name=plan.display_name,
-            price_usd=plan.price_usd,
-            limits=PlanLimitsResponse(
-                projects=plan.projects_limit,
-                reads_per_month=plan.reads_limit,
-                writes_per_month=plan.writes_limit,
-                rag_queries_per_month=plan.rag_queries_limit,
-                pdf_max_size_mb=plan.pdf_max_size_mb,
-                retention_hours=plan.retention_hours,
-                audit_retention_days=plan.audit_retention_days,
-            ),
-            features=plan.features,
-        )
-        for plan in plans
-    ]
+    return _cacheable_response(request, [_to_response(plan) for plan in plans])
 
 
-@router.get("/{plan_name}", response_model=PlanResponse)
-async def get_plan(plan_name: str):
+@router.get(
+    "/{plan_name}",
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": PlanResponse}},
+)
+async def get_plan(
+    plan_name: str,
+    request: Request,
+    plan_repo: PlanRepository = Depends(get_plan_repository),
+):
     """
     Obtener detalles de un plan específico.
     Endpoint público (no requiere autenticación).
     """
-    plan_repo = PlanRepository()
-    plan = plan_repo.get_by_name(plan_name)
+    plan = plan_repo.get_cached(plan_name)
+    if plan is None:
+        plan = await asyncio.to_thread(plan_repo.get_by_name, plan_name)
     
     if not plan:
         raise HTTPException(
@@ -76,18 +141,4 @@ async def get_plan(plan_name: str):
             detail=f"Plan '{plan_name}' not found"
         )
     
-    return PlanResponse(
-        name=plan.name,
-        display_name=plan.display_name,
-        price_usd=plan.price_usd,
-        limits=PlanLimitsResponse(
-            projects=plan.projects_limit,
-            reads_per_month=plan.reads_limit,
-            writes_per_month=plan.writes_limit,
-            rag_queries_per_month=plan.rag_queries_limit,
-            pdf_max_size_mb=plan.pdf_max_size_mb,
-            retention_hours=plan.retention_hours,
-            audit_retention_days=plan.audit_retention_days,
-        ),
-        features=plan.features,
-    )
+    return _cacheable_response(request, _to_response(plan))
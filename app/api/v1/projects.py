@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, status, Request, HTTPException
+from fastapi.responses import ORJSONResponse
 from typing import List
 from app.models.requests import ProjectCreateRequest
 from app.models.responses import ProjectResponse
@@ -6,48 +7,47 @@ from app.services.create_project import CreateProjectService
 from app.services.list_user_projects import ListUserProjectsService
 from app.services.get_project_details import GetProjectDetailsService
 from app.services.list_project_jobs import ListProjectJobsService
-from app.infra.project_repository import ProjectRepository
-from app.infra.user_repository import UserRepository
-from app.infra.plan_repository import PlanRepository
-from app.infra.job_repository import JobRepository
-from app.dependencies.auth import require_user_key
+from app.infra.project_repository import get_project_repository
+from app.infra.user_repository import get_user_repository
+from app.infra.plan_repository import get_plan_repository
+from app.infra.job_repository import get_job_repository
+from app.dependencies.auth import USER_OR_MASTER_LEVELS, AuthContext, require_user_key
+from app.dependencies.params import ProjectIdPath
 
 router = APIRouter()
 
 def get_create_project_service() -> CreateProjectService:
-    repo = ProjectRepository()
-    user_repo = UserRepository()
-    plan_repo = PlanRepository()
-    return CreateProjectService(repo, user_repo, plan_repo)
+    return CreateProjectService(
+        get_project_repository(), get_user_repository(), get_plan_repository()
+    )
 
 def get_list_projects_service() -> ListUserProjectsService:
-    repo = ProjectRepository()
-    return ListUserProjectsService(repo)
+    return ListUserProjectsService(get_project_repository())
 
 def get_project_details_service() -> GetProjectDetailsService:
-    repo = ProjectRepository()
-    return GetProjectDetailsService(repo)
+    return GetProjectDetailsService(get_project_repository())
 
 def get_list_project_jobs_service() -> ListProjectJobsService:
-    return ListProjectJobsService(job_repo=JobRepository())
+    return ListProjectJobsService(job_repo=get_job_repository())
 
 
 @router.get("", response_model=List[dict])
 async def list_projects(
-    user: dict = Depends(require_user_key),
+    user: AuthContext = Depends(require_user_key),
     service: ListUserProjectsService = Depends(get_list_projects_service),
 ):
     """
     Listar todos los proyectos del usuario autenticado.
     Requiere User API Key.
     """
-    return service.execute(user["user_id"])
+    # Lista ya serializada por el servicio: orjson directo, sin validar contra response_model
+    return ORJSONResponse(content=service.execute(user.user_id))
 
 
 @router.get("/{project_id}", response_model=dict)
 async def get_project(
-    project_id: str,
-    user: dict = Depends(require_user_key),
+    project_id: ProjectIdPath,
+    user: AuthContext = Depends(require_user_key),
     service: GetProjectDetailsService = Depends(get_project_details_service),
 ):
     """
@@ -55,7 +55,7 @@ async def get_project(
     Requiere User API Key.
     """
     try:
-        return service.execute(project_id, user["user_id"])
+        return service.execute(project_id, user.user_id)
     except ValueError as e:
         if "not found" in str(e).lower():
             raise HTTPException(
@@ -71,8 +71,8 @@ async def get_project(
 
 @router.get("/{project_id}/api-key", response_model=dict)
 async def get_project_api_key(
-    project_id: str,
-    user: dict = Depends(require_user_key),
+    project_id: ProjectIdPath,
+    user: AuthContext = Depends(require_user_key),
 ):
     """
     Obtener la API key de un proyecto.
@@ -80,10 +80,10 @@ async def get_project_api_key(
     """
     from app.services.get_project_api_key import GetProjectApiKeyService
     
-    service = GetProjectApiKeyService(ProjectRepository())
+    service = GetProjectApiKeyService(get_project_repository())
     
     try:
-        return service.execute(project_id, user["user_id"])
+        return service.execute(project_id, user.user_id)
     except ValueError as e:
         if "not found" in str(e).lower():
             raise HTTPException(
@@ -99,8 +99,8 @@ async def get_project_api_key(
 
 @router.get("/{project_id}/collections", response_model=dict)
 async def list_project_collections(
-    project_id: str,
-    user: dict = Depends(require_user_key),
+    project_id: ProjectIdPath,
+    user: AuthContext = Depends(require_user_key),
 ):
     """
     Listar todas las colecciones de un proyecto.
@@ -108,10 +108,10 @@ async def list_project_collections(
     """
     from app.services.list_project_collections import ListProjectCollectionsService
     
-    service = ListProjectCollectionsService(ProjectRepository())
+    service = ListProjectCollectionsService(get_project_repository())
     
     try:
-        return service.execute(project_id, user["user_id"])
+        return service.execute(project_id, user.user_id)
     except ValueError as e:
         if "not found" in str(e).lower():
             raise HTTPException(
@@ -141,7 +141,7 @@ async def create_project(
     Valida límites del plan del usuario.
     """
     # El middleware ya validó la autenticación
-    if request.state.auth_level not in ["user", "master"]:
+    if getattr(request.state, "auth_level", None) not in USER_OR_MASTER_LEVELS:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User API Key required"
@@ -162,10 +162,10 @@ async def create_project(
 
 @router.get("/{project_id}/jobs")
 async def list_project_jobs(
-    project_id: str,
+    project_id: ProjectIdPath,
     limit: int = 50,
     status_filter: str = None,
-    user: dict = Depends(require_user_key),
+    user: AuthContext = Depends(require_user_key),
     service: ListProjectJobsService = Depends(get_list_project_jobs_service),
 ):
     """
@@ -177,7 +177,7 @@ async def list_project_jobs(
     
     Requiere User API Key.
     """
-    user_id = user["user_id"]
+    user_id = user.user_id
     
     try:
         result = service.execute(
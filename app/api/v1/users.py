@@ -1,14 +1,18 @@
 """
 Endpoints de usuarios (requieren User API Key).
 """
+import asyncio
 import logging
 from fastapi import APIRouter, HTTPException, status, Request, Depends
+from fastapi.responses import ORJSONResponse
+from datetime import datetime
 from pydantic import BaseModel
 from typing import List
 
-from app.infra.user_repository import UserRepository
-from app.infra.plan_repository import PlanRepository
-from app.dependencies.auth import require_user_key
+from app.infra.plan_repository import PlanRepository, get_plan_repository
+from app.infra.user_repository import UserRepository, get_user_repository
+from app.dependencies.auth import USER_OR_MASTER_LEVELS, AuthContext, require_user_key
+from app.config import settings
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -37,13 +41,18 @@ class UserInfoResponse(BaseModel):
     email: str
     plan: str
     status: str
-    created_at: str
+    created_at: datetime
+
+
+class CurrentPeriod(BaseModel):
+    start: datetime
+    end: datetime
 
 
 class AnalyticsResponse(BaseModel):
     user_id: str
     plan: str
-    current_period: dict
+    current_period: CurrentPeriod
     usage: UsageResponse
     projects: ProjectSummary
 
@@ -51,7 +60,10 @@ class AnalyticsResponse(BaseModel):
 
 # Endpoints
 @router.get("/me", response_model=UserInfoResponse)
-async def get_current_user(user: dict = Depends(require_user_key)):
+async def get_current_user(
+    request: Request,
+    user: AuthContext = Depends(require_user_key),
+):
     """
     Get current authenticated user information.
     
@@ -60,64 +72,67 @@ async def get_current_user(user: dict = Depends(require_user_key)):
     Returns:
         User information including email, plan, and status
     """
-    from app.infra.user_repository import UserRepository
-    
-    try:
-        user_repo = UserRepository()
-        user_obj = user_repo.get_by_id(user["user_id"])
-        
-        if not user_obj:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        return UserInfoResponse(
-            user_id=user_obj.id,
-            email=user_obj.email,
-            plan=user_obj.plan_name,
-            status=user_obj.status,
-            created_at=user_obj.created_at.isoformat()
-        )
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error fetching user info: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to fetch user information"
-        )
-
-
-@router.get("/debug/auth")
-async def debug_auth(request: Request):
-    """Debug endpoint to test middleware authentication"""
-    return {
-        "has_auth_level": hasattr(request.state, 'auth_level'),
-        "auth_level": getattr(request.state, 'auth_level', None),
-        "has_user": hasattr(request.state, 'user'),
-        "user_id": getattr(request.state, 'user', None).id if hasattr(request.state, 'user') else None,
-    }
+    # AuthMiddleware ya cargó (y validó como activo) al usuario en este mismo
+    # request: se responde con esa entidad, sin otra consulta a MongoDB.
+    # Con X-User-Key/X-API-Key viene de la caché de usuarios: plan y estado
+    # pueden ir hasta ~user_cache_sync_seconds atrasados respecto de otro worker
+    # Campos ya validados: respuesta directa (orjson serializa el datetime)
+    user_obj = request.state.user
+    return ORJSONResponse(content={
+        "user_id": user_obj.id,
+        "email": user_obj.email,
+        "plan": user_obj.plan_name,
+        "status": user_obj.status,
+        "created_at": user_obj.created_at,
+    })
+
+
+# Endpoint de diagnóstico: no se registra en producción
+if settings.environment != "production":
+    @router.get("/debug/auth")
+    async def debug_auth(request: Request):
+        """Debug endpoint to test middleware authentication"""
+        return {
+            "has_auth_level": hasattr(request.state, 'auth_level'),
+            "auth_level": getattr(request.state, 'auth_level', None),
+            "has_user": hasattr(request.state, 'user'),
+            "user_id": getattr(request.state, 'user', None).id if hasattr(request.state, 'user') else None,
+        }
 
 
 @router.get("/me/usage", response_model=AnalyticsResponse)
-async def get_user_usage(request: Request):
+async def get_user_usage(
+    request: Request,
+    plan_repo: PlanRepository = Depends(get_plan_repository),
+    user_repo: UserRepository = Depends(get_user_repository),
+):
     """
     Obtener uso actual y límites del usuario autenticado.
     Requiere User API Key.
+    
+    Los contadores se leen de MongoDB en cada llamada: el usuario que dejó el
+    middleware puede venir de la caché (hasta 60s atrás) salvo con JWT.
     """
-    if request.state.auth_level not in ["user", "master"]:
+    if getattr(request.state, "auth_level", None) not in USER_OR_MASTER_LEVELS:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User API Key required"
         )
     
     user = request.state.user
+    if getattr(request.state, "auth_method", None) != "jwt":
+        user = await asyncio.to_thread(user_repo.get_by_id, user.id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
     
-    # Obtener plan para límites
-    plan_repo = PlanRepository()
-    plan = plan_repo.get_by_name(user.plan_name)
+    # Obtener plan para límites: el plan casi siempre está en la caché en
+    # memoria (0 round-trips). Solo si no, va a la BD
+    plan = plan_repo.get_cached(user.plan_name)
+    if plan is None:
+        plan = await asyncio.to_thread(plan_repo.get_by_name, user.plan_name)
     
     if not plan:
         raise HTTPException(
@@ -125,38 +140,36 @@ async def get_user_usage(request: Request):
             detail="Plan configuration not found"
         )
     
-    # Calcular porcentajes
-    def calc_percentage(count: int, limit: int) -> float:
-        if limit == 0:
-            return 0.0
-        return round((count / limit) * 100, 2)
+    # Calcular porcentajes (count, limit) de una pasada, sin closure por request
+    usage = user.usage
+    limits = plan.limits
+    reads, writes, rag_queries = (
+        UsageLimitResponse(
+            count=count,
+            limit=limit,
+            percentage=round(count * 100 / limit, 2) if limit else 0.0,
+        )
+        for count, limit in (
+            (usage.reads_count, limits.reads),
+            (usage.writes_count, limits.writes),
+            (usage.rag_queries_count, limits.rag_queries),
+        )
+    )
     
-    return AnalyticsResponse(
+    analytics = AnalyticsResponse(
         user_id=user.id,
         plan=user.plan_name,
-        current_period={
-            "start": user.usage.period_start.isoformat(),
-            "end": user.usage.period_end.isoformat(),
-        },
-        usage=UsageResponse(
-            reads=UsageLimitResponse(
-                count=user.usage.reads_count,
-                limit=plan.reads_limit,
-                percentage=calc_percentage(user.usage.reads_count, plan.reads_limit),
-            ),
-            writes=UsageLimitResponse(
-                count=user.usage.writes_count,
-                limit=plan.writes_limit,
-                percentage=calc_percentage(user.usage.writes_count, plan.writes_limit),
-            ),
-            rag_queries=UsageLimitResponse(
-                count=user.usage.rag_queries_count,
-                limit=plan.rag_queries_limit,
-                percentage=calc_percentage(user.usage.rag_queries_count, plan.rag_queries_limit),
-            ),
+        current_period=CurrentPeriod(
+            start=usage.period_start,
+            end=usage.period_end,
         ),
+        usage=UsageResponse(reads=reads, writes=writes, rag_queries=rag_queries),
         projects=ProjectSummary(
-            active=user.usage.projects_count,
-            limit=plan.projects_limit,
+            active=usage.projects_count,
+            limit=limits.projects,
         ),
     )
+    
+    # Modelo ya validado al construirse: ORJSONResponse evita la segunda
+    # validación contra response_model (que se mantiene para el schema OpenAPI)
+    return ORJSONResponse(content=analytics.model_dump())
@@ -1,30 +1,103 @@
 """
 Router para servir la landing page y documentación.
 """
-from fastapi import APIRouter, Request, HTTPException, status, Depends
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import APIRouter, Request, Response, HTTPException, status, Depends
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, EmailStr
+from email_validator import EmailNotValidError, validate_email
+from pydantic import AfterValidator, BaseModel
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Annotated, Dict, List, Optional, Tuple
+import asyncio
 import logging
 
-from app.infra.plan_repository import PlanRepository
-from app.infra.lead_repository import LeadRepository
+import orjson
+
+from app.domain.entities import Plan
+from app.infra.plan_repository import get_plan_repository
+from app.infra.lead_repository import get_lead_repository
 from app.services.create_lead import CreateLeadService
+from app.dependencies.admission import admission_control
 from app.config import settings
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
+# Los templates solo cambian con un deploy: sin stat del archivo en cada render
+templates.env.auto_reload = False
 logger = logging.getLogger(__name__)
 
+# Body de /pricing-data ya serializado, junto a los planes de los que salió.
+# PlanRepository.get_all sale de su caché en memoria: mientras los planes sean
+# iguales (comparar ~3 dataclasses) se reutiliza el body; si cambian, se regenera
+_pricing_body: Optional[Tuple[List[Plan], bytes]] = None
+
+# Páginas sin contexto dinámico: se renderizan una vez y se sirven como bytes
+STATIC_PAGE_TEMPLATES = (
+    "landing/index.html",
+    "dashboard/register.html",
+    "dashboard/desktop_only.html",
+    "dashboard/project_new.html",
+)
+STATIC_PAGE_CACHE_CONTROL = "public, max-age=300"
+_static_pages: Dict[str, bytes] = {}
+
+# Contexto común de las páginas del dashboard (no cambia en runtime)
+_DASHBOARD_CONTEXT = MappingProxyType({"is_dev": settings.environment == "development"})
+
+
+def warm_templates() -> int:
+    """
+    Compilar todos los templates al arrancar (quedan en la caché de Jinja2)
+    y pre-renderizar las páginas estáticas.
+    
+    Returns:
+        Número de templates compilados
+    """
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    
+    for name in STATIC_PAGE_TEMPLATES:
+        _static_pages[name] = templates.env.get_template(name).render().encode()
+    
+    return len(names)
+
+
+def _static_page(name: str) -> HTMLResponse:
+    """Servir una página pre-renderizada (se renderiza al vuelo si no hubo warm-up)"""
+    content = _static_pages.get(name)
+    if content is None:
+        content = _static_pages[name] = templates.env.get_template(name).render().encode()
+    return HTMLResponse(content=content, headers={"Cache-Control": STATIC_PAGE_CACHE_CONTROL})
+
+
+def _render_page(request: Request, name: str, **context) -> HTMLResponse:
+    """Renderizar un template dinámico con el contexto común del dashboard"""
+    return templates.TemplateResponse(request, name, {**_DASHBOARD_CONTEXT, **context})
+
 
 # Dependency Injection
 def get_create_lead_service() -> CreateLeadService:
-    return CreateLeadService(lead_repo=LeadRepository())
+    return CreateLeadService(lead_repo=get_lead_repository())
+
+
+@lru_cache(maxsize=2048)
+def _normalize_email(email: str) -> str:
+    """
+    Validar y normalizar un email (misma librería que EmailStr, sin DNS).
+    
+    Cacheado: los envíos repetidos (reintentos, bots) no se vuelven a parsear.
+    """
+    try:
+        return validate_email(email, check_deliverability=False).normalized
+    except EmailNotValidError as e:
+        raise ValueError(f"value is not a valid email address: {e}") from None
 
 
 # Request Models
 class ContactRequest(BaseModel):
-    email: EmailStr
+    email: Annotated[str, AfterValidator(_normalize_email)]
     name: str
     company: str | None = None
     interest: str
@@ -32,21 +105,15 @@ class ContactRequest(BaseModel):
 
 
 @router.get("/", response_class=HTMLResponse)
-async def landing_page(request: Request):
+async def landing_page():
     """Landing page principal"""
-    return templates.TemplateResponse(
-        "landing/index.html",
-        {"request": request}
-    )
+    return _static_page("landing/index.html")
 
 
 @router.get("/pricing", response_class=HTMLResponse)
 async def pricing_page(request: Request):
     """Página de pricing"""
-    return templates.TemplateResponse(
-        "landing/pricing.html",
-        {"request": request}
-    )
+    return templates.TemplateResponse(request, "landing/pricing.html")
 
 
 # @router.get("/api-docs", response_class=HTMLResponse)
@@ -60,113 +127,64 @@ async def pricing_page(request: Request):
 @router.get("/docs-page", response_class=HTMLResponse)
 async def docs_page(request: Request):
     """Página de documentación"""
-    return templates.TemplateResponse(
-        "docs/index.html",
-        {"request": request}
-    )
+    return templates.TemplateResponse(request, "docs/index.html")
 
 
 @router.get("/dashboard/login", response_class=HTMLResponse)
 async def dashboard_login(request: Request):
     """Dashboard login page"""
-    return templates.TemplateResponse(
-        "dashboard/login.html",
-        {
-            "request": request,
-            "is_dev": settings.environment == "development"
-        }
-    )
+    return _render_page(request, "dashboard/login.html")
 
 
 @router.get("/dashboard/register", response_class=HTMLResponse)
-async def dashboard_register(request: Request):
+async def dashboard_register():
     """Dashboard register page"""
-    return templates.TemplateResponse(
-        "dashboard/register.html",
-        {"request": request}
-    )
+    return _static_page("dashboard/register.html")
 
 
 @router.get("/dashboard/desktop-only", response_class=HTMLResponse)
-async def dashboard_desktop_only(request: Request):
+async def dashboard_desktop_only():
     """Desktop-only restriction page"""
-    return templates.TemplateResponse(
-        "dashboard/desktop_only.html",
-        {"request": request}
-    )
+    return _static_page("dashboard/desktop_only.html")
 
 
 @router.get("/dashboard", response_class=HTMLResponse)
 async def dashboard_overview(request: Request):
     """Dashboard overview page"""
-    return templates.TemplateResponse(
-        "dashboard/overview.html",
-        {
-            "request": request,
-            "is_dev": settings.environment == "development"
-        }
-    )
+    return _render_page(request, "dashboard/overview.html")
 
 
 @router.get("/dashboard/projects", response_class=HTMLResponse)
 async def dashboard_projects(request: Request):
     """Dashboard projects list page"""
-    return templates.TemplateResponse(
-        "dashboard/projects.html",
-        {
-            "request": request,
-            "is_dev": settings.environment == "development"
-        }
-    )
+    return _render_page(request, "dashboard/projects.html")
 
 
 @router.get("/dashboard/projects/new", response_class=HTMLResponse)
-async def dashboard_project_new(request: Request):
+async def dashboard_project_new():
     """Dashboard create project page"""
-    return templates.TemplateResponse(
-        "dashboard/project_new.html",
-        {"request": request}
-    )
+    return _static_page("dashboard/project_new.html")
 
 
 @router.get("/dashboard/projects/{project_id}", response_class=HTMLResponse)
 async def dashboard_project_detail(request: Request, project_id: str):
     """Dashboard project detail page"""
-    return templates.TemplateResponse(
-        "dashboard/project_detail.html",
-        {
-            "request": request, 
-            "project_id": project_id,
-            "is_dev": settings.environment == "development"
-        }
-    )
+    return _render_page(request, "dashboard/project_detail.html", project_id=project_id)
 
 
 @router.get("/dashboard/projects/{project_id}/playground", response_class=HTMLResponse)
 async def dashboard_project_playground(request: Request, project_id: str):
     """Dashboard RAG Playground page"""
-    return templates.TemplateResponse(
-        "dashboard/playground.html",
-        {
-            "request": request, 
-            "project_id": project_id, 
-            "active_page": "playground",
-            "is_dev": settings.environment == "development"
-        }
+    return _render_page(
+        request, "dashboard/playground.html", project_id=project_id, active_page="playground"
     )
 
 
 @router.get("/dashboard/projects/{project_id}/jobs", response_class=HTMLResponse)
 async def dashboard_project_jobs(request: Request, project_id: str):
     """Dashboard Jobs Tracking page"""
-    return templates.TemplateResponse(
-        "dashboard/jobs.html",
-        {
-            "request": request, 
-            "project_id": project_id, 
-            "active_page": "jobs",
-            "is_dev": settings.environment == "development"
-        }
+    return _render_page(
+        request, "dashboard/jobs.html", project_id=project_id, active_page="jobs"
     )
 
 
@@ -176,10 +194,18 @@ async def get_pricing_data():
     Obtener datos de pricing desde la base de datos.
     Endpoint público para cargar dinámicamente en la landing.
     """
-    plan_repo = PlanRepository()
-    plans = plan_repo.get_all()
+    global _pricing_body
+    plan_repo = get_plan_repository()
+    # Con la caché caliente se evita el salto a un thread
+    plans = plan_repo.get_all_cached()
+    if plans is None:
+        plans = await asyncio.to_thread(plan_repo.get_all)
     
-    return {
+    cached = _pricing_body
+    if cached is not None and cached[0] == plans:
+        return Response(content=cached[1], media_type=ORJSONResponse.media_type)
+    
+    body = orjson.dumps({
         "plans": [
             {
                 "name": plan.name,
@@ -197,10 +223,13 @@ async def get_pricing_data():
             }
             for plan in plans
         ]
-    }
+    })
+    _pricing_body = (plans, body)
+    
+    return Response(content=body, media_type=ORJSONResponse.media_type)
 
 
-@router.post("/contact")
+@router.post("/contact", dependencies=[Depends(admission_control("contact"))])
 async def submit_contact_form(
     payload: ContactRequest,
     service: CreateLeadService = Depends(get_create_lead_service),
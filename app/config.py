@@ -1,18 +1,22 @@
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
 class Settings(BaseSettings):
-    mongo_uri: str = None
+    # Settings are read once at startup and never mutated afterwards
+    model_config = SettingsConfigDict(env_file=".env", frozen=True)
+
+    mongo_uri: Optional[str] = None
     mongo_meta_db: str = "meta"
-    gemini_api_key: str = None
-    encryption_key: str = None  # For encrypting API keys (Fernet key)
+    gemini_api_key: Optional[str] = None
+    encryption_key: Optional[str] = None  # For encrypting API keys (Fernet key)
     
     # Static files version for cache busting
     static_version: str = "1.0.0"
     
     # SMTP Configuration
     mail_host: str = "smtp.gmail.com"
-    mail_port: int = 587
+    mail_port: int = 465  # 465 = implicit TLS (SMTP_SSL), 587 = STARTTLS
     mail_auth: Optional[str] = None  # SMTP username (email)
     mail_password: Optional[str] = None  # SMTP password or app password
     
@@ -32,14 +36,44 @@ class Settings(BaseSettings):
     otp_expire_seconds: int = 60  # 1 minute
     otp_length: int = 6
 
+    # Threadpool para I/O bloqueante (pymongo, SMTP) ejecutado desde endpoints async
+    threadpool_max_workers: int = 64
+
+    # Procesos para extraer texto de PDFs grandes, por worker web (se acota a los CPUs)
+    pdf_process_workers: int = 2
+
+    # Pool de conexiones MongoDB, por cliente: cada worker abre uno sync y uno
+    # async, así que el total es 2 × WEB_CONCURRENCY × estos valores
+    # (4 workers: 8 conexiones ociosas, hasta 400 en pico)
+    mongo_max_pool_size: int = 50
+    mongo_min_pool_size: int = 1
+    mongo_compressors: str = "zstd,zlib"  # zlib: fallback sin dependencias extra
+    mongo_server_selection_timeout_ms: int = 2000
+    mongo_wait_queue_timeout_ms: int = 1000  # pool agotado: fallar rápido en vez de colgar el request
+
+    # Control de admisión para endpoints con SMTP/MongoDB (OTP, contacto)
+    admission_max_concurrent: int = 16
+    admission_queue_timeout_seconds: float = 2.0
+
+    # Requests a Gemini en vuelo a la vez por proceso (embeddings + LLM)
+    gemini_max_concurrency: int = 8
+
+    # Cada worker cachea usuarios en memoria: cada cuántos segundos revisa los
+    # usuarios modificados (bloqueo, cambio de plan) por otros workers
+    user_cache_sync_seconds: float = 2.0
+
+    # Listeners asíncronos del EventBus ejecutándose a la vez (el resto espera turno)
+    event_bus_concurrency: int = 64
+
     # Environment
     environment: str = "development"  # development | production
     mock_otp: bool = False  # If true, OTP is always 000000 and email is skipped
 
-    class Config:
-        env_file = ".env"
-
-settings = Settings()
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    return settings
\ No newline at end of file
+    """Single Settings instance; usable as a FastAPI dependency (Depends(get_settings))"""
+    return Settings()
+
+
+settings = get_settings()
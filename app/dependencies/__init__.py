@@ -2,6 +2,8 @@
 Dependencies para FastAPI endpoints.
 """
 from app.dependencies.auth import (
+    AuthContext,
+    KeyAuthContext,
     require_master_key,
     require_user_key,
     require_project_key,
@@ -9,6 +11,8 @@ from app.dependencies.auth import (
 )
 
 __all__ = [
+    "AuthContext",
+    "KeyAuthContext",
     "require_master_key",
     "require_user_key",
     "require_project_key",
@@ -0,0 +1,34 @@
+"""
+Dependency de control de admisión (ver app.infra.admission_limiter).
+"""
+from typing import AsyncIterator, Callable
+
+from fastapi import HTTPException, status
+
+from app.infra.admission_limiter import get_admission_limiter
+
+
+def admission_control(group: str) -> Callable[[], AsyncIterator[None]]:
+    """
+    Crear una dependency que admite el request solo si hay lugar en `group`.
+
+    Uso: `dependencies=[Depends(admission_control("otp"))]` en el decorador.
+
+    Raises:
+        HTTPException 503: Si el request no consiguió lugar dentro del timeout de cola
+    """
+    limiter = get_admission_limiter(group)
+
+    async def dependency() -> AsyncIterator[None]:
+        if not await limiter.acquire():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    return dependency
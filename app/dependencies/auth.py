@@ -3,10 +3,68 @@ Dependencies de autenticación para FastAPI.
 Estas dependencies validan los headers de autenticación y aparecen en OpenAPI.
 """
 from fastapi import Header, HTTPException, status, Request
-from typing import Annotated, Optional
+from dataclasses import asdict, dataclass
+from typing import Annotated, Any, Dict, Optional
+import logging
 
 from app.domain.entities import User
 
+logger = logging.getLogger(__name__)
+
+# Niveles que pueden operar sobre recursos propios del usuario (ver endpoints de /users y /projects)
+USER_OR_MASTER_LEVELS = frozenset(("user", "master"))
+
+
+@dataclass(frozen=True, slots=True)
+class AuthContext:
+    """Usuario autenticado (resultado de require_user_key)"""
+    user_id: str
+    email: str
+    plan: str
+    status: str
+    created_at: str  # ISO 8601
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class KeyAuthContext:
+    """Usuario (y proyecto, si se autenticó con Project Key) del request"""
+    user: User
+    user_id: str
+    auth_level: str  # "user" | "project"
+    project: Optional[dict] = None
+    project_id: Optional[str] = None
+    
+    def as_dict(self) -> Dict[str, Any]:
+        result = {"user": self.user, "user_id": self.user_id, "auth_level": self.auth_level}
+        if self.auth_level == "project":
+            result["project"] = self.project
+            result["project_id"] = self.project_id
+        return result
+
+
+def _user_key_context(state) -> KeyAuthContext:
+    return KeyAuthContext(user=state.user, user_id=state.user_id, auth_level="user")
+
+
+def _project_key_context(state) -> KeyAuthContext:
+    return KeyAuthContext(
+        user=state.user,
+        user_id=state.user_id,
+        auth_level="project",
+        project=state.project,
+        project_id=state.project_id,
+    )
+
+
+# Constructor del contexto según el nivel de auth (niveles aceptados por require_user_or_project_key)
+_KEY_CONTEXT_BUILDERS = {
+    "user": _user_key_context,
+    "project": _project_key_context,
+}
+
 
 async def require_master_key(
     request: Request,
@@ -26,7 +84,7 @@ async def require_master_key(
         HTTPException: Si no está autenticado con Master Key
     """
     # El middleware ya validó el header, solo verificamos el nivel
-    if not hasattr(request.state, 'auth_level') or request.state.auth_level != "master":
+    if getattr(request.state, "auth_level", None) != "master":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Master API Key required"
@@ -38,7 +96,7 @@ async def require_master_key(
 async def require_user_key(
     request: Request,
     x_user_key: Annotated[Optional[str], Header(description="User API Key (Optional if Bearer Token used)")] = None
-) -> dict:
+) -> AuthContext:
     """
     Dependency que requiere autenticación de usuario (User API Key O JWT Bearer Token).
     
@@ -47,47 +105,37 @@ async def require_user_key(
         x_user_key: Header X-User-Key (Opcional si se usa Authorization header)
     
     Returns:
-        Diccionario con información del usuario autenticado
+        AuthContext con información del usuario autenticado
     
     Raises:
         HTTPException: Si no está autenticado como usuario
     """
-    # Debug logging
-    # import logging
-    # logger = logging.getLogger(__name__)
-    # logger.debug(f"require_user_key called. Auth level: {getattr(request.state, 'auth_level', 'None')}")
+    state = request.state
     
-    # El middleware ya validó la autenticación (sea por Key o JWT)
-    if not hasattr(request.state, 'auth_level') or request.state.auth_level != "user":
+    # El middleware ya validó la autenticación (sea por Key o JWT), solo verificamos el nivel
+    level = getattr(state, "auth_level", None)
+    if level != "user":
+        logger.debug("Auth check failed. auth_level=%s", level)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Authentication required (User API Key or Bearer Token)"
         )
     
-    # El middleware ya validó el header, solo verificamos el nivel
-    if not hasattr(request.state, 'auth_level') or request.state.auth_level != "user":
-        logger.error(f"Auth check failed. auth_level={getattr(request.state, 'auth_level', 'NOT SET')}")
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User API Key required"
-        )
-    
-    user = request.state.user
+    user = state.user
     
-    # Retornar diccionario serializado
-    return {
-        "user_id": user.id,
-        "email": user.email,
-        "plan": user.plan_name,
-        "status": user.status,
-        "created_at": user.created_at.isoformat(),
-    }
+    return AuthContext(
+        user_id=user.id,
+        email=user.email,
+        plan=user.plan_name,
+        status=user.status,
+        created_at=user.created_at_iso,
+    )
 
 
 async def require_project_key(
     request: Request,
     x_api_key: Annotated[str, Header(description="Project API Key para operaciones de proyecto")]
-) -> dict:
+) -> KeyAuthContext:
     """
     Dependency que requiere Project API Key.
     
@@ -101,26 +149,23 @@ async def require_project_key(
     Raises:
         HTTPException: Si no está autenticado con Project Key
     """
+    state = request.state
+    
     # El middleware ya validó el header, solo verificamos el nivel
-    if not hasattr(request.state, 'auth_level') or request.state.auth_level != "project":
+    if getattr(state, "auth_level", None) != "project":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Project API Key required"
         )
     
-    return {
-        "project": request.state.project,
-        "project_id": request.state.project_id,
-        "user": request.state.user,
-        "user_id": request.state.user_id,
-    }
+    return _project_key_context(state)
 
 
 async def require_user_or_project_key(
     request: Request,
     x_user_key: Annotated[Optional[str], Header(description="User API Key")] = None,
     x_api_key: Annotated[Optional[str], Header(description="Project API Key")] = None,
-) -> dict:
+) -> KeyAuthContext:
     """
     Dependency que requiere User Key O Project Key.
     
@@ -135,28 +180,22 @@ async def require_user_or_project_key(
     Raises:
         HTTPException: Si no está autenticado
     """
+    state = request.state
+    
     # El middleware ya validó el header
-    if not hasattr(request.state, 'auth_level'):
+    level = getattr(state, "auth_level", None)
+    if level is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required (User Key or Project Key)"
         )
     
-    if request.state.auth_level not in ["user", "project"]:
+    build_context = _KEY_CONTEXT_BUILDERS.get(level)
+    if build_context is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User API Key or Project API Key required"
         )
     
-    result = {
-        "user": request.state.user,
-        "user_id": request.state.user_id,
-        "auth_level": request.state.auth_level,
-    }
-    
-    # Si es autenticación de proyecto, agregar info del proyecto
-    if request.state.auth_level == "project":
-        result["project"] = request.state.project
-        result["project_id"] = request.state.project_id
-    
-    return result
+    # Con Project Key el contexto incluye además la info del proyecto
+    return build_context(state)
@@ -0,0 +1,14 @@
+"""
+Parámetros de ruta con formato validado.
+Los IDs mal formados se rechazan con 422 antes de consultar MongoDB.
+"""
+from typing import Annotated
+
+from fastapi import Path
+
+# Formatos generados por CreateProjectService y IngestStrategy._generate_job_id
+PROJECT_ID_PATTERN = r"^proj_[0-9a-f]{8}$"
+JOB_ID_PATTERN = r"^job_[0-9a-f]{12}$"
+
+ProjectIdPath = Annotated[str, Path(pattern=PROJECT_ID_PATTERN, description="ID del proyecto (proj_xxxxxxxx)")]
+JobIdPath = Annotated[str, Path(pattern=JOB_ID_PATTERN, description="ID del job (job_xxxxxxxxxxxx)")]
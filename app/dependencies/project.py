@@ -1,25 +1,31 @@
 from fastapi import Header, Query, Depends, HTTPException, status, Request
 from typing import Optional
-from datetime import datetime, timezone
+import time
 
-from app.infra.project_repository import ProjectRepository
+from app.infra.project_repository import ProjectRepository, get_project_repository
 from app.domain.entities import Project
 
-def get_project_repo() -> ProjectRepository:
-    return ProjectRepository()
-
 async def get_project_context(
     request: Request,
     x_api_key: Optional[str] = Header(None, alias="X-API-Key"),
     project_id: Optional[str] = Query(None, alias="project_id"),
-    repo: ProjectRepository = Depends(get_project_repo),
+    repo: ProjectRepository = Depends(get_project_repository),
 ) -> Project:
     """
     Resolve project context from X-API-Key OR JWT + project_id.
+    FastAPI caches this dependency, so it resolves once per request.
     """
+    state = request.state
+    auth_level = getattr(state, "auth_level", None)
+    
     # 1. Try X-API-Key (Classic/SDK)
     if x_api_key:
-        project = repo.get_by_api_key(x_api_key)
+        # AuthMiddleware already looked this key up: reuse its document instead of querying again
+        project_doc = getattr(state, "project", None) if auth_level == "project" else None
+        if project_doc:
+            project = repo.to_entity(project_doc)
+        else:
+            project = await repo.get_by_api_key_async(x_api_key)
         if not project:
             raise HTTPException(status_code=401, detail="Invalid API Key")
         
@@ -29,12 +35,11 @@ async def get_project_context(
 
     # 2. Try JWT + project_id (Dashboard)
     # Check if user is authenticated via JWT (AuthMiddleware sets request.state.user)
-    if hasattr(request.state, "user") and request.state.user:
-        user = request.state.user
-        
-        # Try header X-Project-Id if query param missing
+    user = getattr(state, "user", None)
+    if user:
+        # Try header X-Project-Id if query param missing (AuthMiddleware already read it)
         if not project_id:
-             project_id = request.headers.get("X-Project-Id")
+            project_id = getattr(state, "project_id_header", None)
         
         if not project_id:
             raise HTTPException(
@@ -42,14 +47,14 @@ async def get_project_context(
                 detail="Project context required. Provide 'X-API-Key' header OR 'project_id' query param with JWT."
             )
             
-        project = repo.get_by_id(project_id)
+        project = repo.get_by_id_cached(project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         
         # Verify ownership
         if project.user_id != user.id:
             # Check if user is master/admin? (Future proofing, for now strictly owner)
-            if getattr(request.state, "auth_level", "") == "master":
+            if auth_level == "master":
                 pass 
             else:
                 raise HTTPException(status_code=403, detail="Not authorized to access this project")
@@ -61,10 +66,6 @@ async def get_project_context(
     raise HTTPException(status_code=401, detail="Authentication required (X-API-Key or Bearer Token)")
 
 def _check_expiry(project: Project):
-    if project.expires_at:
-        expires = project.expires_at
-        if expires.tzinfo is None:
-            expires = expires.replace(tzinfo=timezone.utc)
-        
-        if expires < datetime.now(timezone.utc):
-            raise HTTPException(status_code=410, detail="Project expired")
+    # expires_ts ya viene normalizado a UTC desde la entidad
+    if project.expires_ts < time.time():
+        raise HTTPException(status_code=410, detail="Project expired")
@@ -3,4 +3,4 @@ from typing import Protocol, List
 
 class EmbeddingProvider(Protocol):
     async def embed(self, text: str) -> List[float]: ...
-    async def embed_batch(self, texts: List[str]) -> List[List[float]]: ...
+    async def embed_batch(self, texts: List[str], batch_size: int = ...) -> List[List[float]]: ...
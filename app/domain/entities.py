@@ -1,15 +1,15 @@
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from typing import List
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Database:
     name: str
     expires_at: datetime
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ProjectStats:
     """Estadísticas de uso del proyecto"""
     reads_count: int = 0
@@ -18,7 +18,7 @@ class ProjectStats:
     last_activity: datetime | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, eq=False)
 class Project:
     id: str
     user_id: str  # Relación con User
@@ -29,10 +29,39 @@ class Project:
     expires_at: datetime
     database: Database
     stats: ProjectStats  # Estadísticas de uso del proyecto
+    
+    # expires_at como epoch en segundos (derivado; Mongo devuelve datetimes naive en UTC)
+    expires_ts: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        expires = self.expires_at
+        if expires is None:
+            expires_ts = float("inf")
+        else:
+            if expires.tzinfo is None:
+                expires = expires.replace(tzinfo=timezone.utc)
+            expires_ts = expires.timestamp()
+        object.__setattr__(self, "expires_ts", expires_ts)
+    
+    # Identidad por ID (las instancias salen de cachés): hash/eq O(1), no por todos los campos
+    def __eq__(self, other):
+        return type(self) is type(other) and self.id == other.id
+    
+    def __hash__(self):
+        return hash(self.id)
+
+
 
+@dataclass(frozen=True, slots=True)
+class PlanLimits:
+    """Límites de uso mensual de un plan, agrupados para lectura en una sola pasada"""
+    reads: int
+    writes: int
+    rag_queries: int
+    projects: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Plan:
     """Plan de suscripción (Free, Starter, Pro)"""
     name: str  # "free" | "starter" | "pro"
@@ -50,9 +79,20 @@ class Plan:
     
     # Features
     features: List[str]  # ["webhooks", "analytics_advanced", "export_metrics"]
+    
+    # Límites de uso agrupados (derivados; se calculan una vez al construir el plan)
+    limits: PlanLimits = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "limits", PlanLimits(
+            reads=self.reads_limit,
+            writes=self.writes_limit,
+            rag_queries=self.rag_queries_limit,
+            projects=self.projects_limit,
+        ))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class UsageStats:
     """Estadísticas de uso del usuario (se resetea mensualmente)"""
     projects_count: int
@@ -63,7 +103,7 @@ class UsageStats:
     period_end: datetime
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, eq=False)
 class User:
     """Usuario de SonqoBase (developer que usa la plataforma)"""
     id: str  # user_abc123
@@ -79,9 +119,22 @@ class User:
     
     # Webhooks (solo Plan Pro)
     webhook_url: str | None = None
+    
+    # created_at en ISO 8601 (derivado; se formatea una vez al construir el usuario)
+    created_at_iso: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "created_at_iso", self.created_at.isoformat())
+    
+    # Identidad por ID, igual que Project
+    def __eq__(self, other):
+        return type(self) is type(other) and self.id == other.id
+    
+    def __hash__(self):
+        return hash(self.id)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MasterKey:
     """API Key maestra para administración"""
     key_hash: str  # Hash SHA-256
@@ -91,7 +144,7 @@ class MasterKey:
     is_active: bool = True
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Lead:
     """Lead de contacto desde landing page"""
     email: str
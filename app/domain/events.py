@@ -2,20 +2,46 @@
 Domain Events para SonqoBase.
 Eventos inmutables que representan hechos que ocurrieron en el sistema.
 """
+from array import array
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional, List
-from abc import ABC
-
-
-# Base abstracta sin campos (solo para type checking)
-class DomainEvent(ABC):
-    """Base class para todos los eventos de dominio"""
-    pass
+import time
+
+
+# Base marcadora sin campos (solo para type checking). `__slots__ = ()` para que
+# los eventos (dataclasses con slots=True) no arrastren un __dict__ por instancia
+class DomainEvent:
+    """
+    Base class para todos los eventos de dominio.
+    
+    `timestamp` es epoch en segundos (time.time(), mucho más barato que
+    datetime.now(tz) al crear cada evento); los consumidores que necesitan
+    un datetime lo materializan con `as_datetime()`.
+    """
+    __slots__ = ()
+    
+    def as_datetime(self) -> datetime:
+        """Momento del evento como datetime UTC"""
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
+
+
+@dataclass(frozen=True, slots=True)
+class ProjectScopedEvent(DomainEvent):
+    """
+    Base de los eventos sobre una colección de un proyecto.
+    
+    Los tres campos comunes van primero en el layout (slots) de todos los
+    eventos del pipeline; cada subclase agrega solo sus campos propios.
+    Los eventos se construyen siempre con keywords.
+    """
+    user_id: str
+    project_id: str
+    collection: str
 
 
 # Eventos de Proyectos
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ProjectCreatedEvent(DomainEvent):
     """Evento cuando se crea un proyecto"""
     user_id: str
@@ -23,199 +49,154 @@ class ProjectCreatedEvent(DomainEvent):
     project_slug: str
     project_name: str
     plan_name: str
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
 # Eventos de Documentos (CRUD)
-@dataclass(frozen=True)
-class DocumentReadEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class DocumentReadEvent(ProjectScopedEvent):
     """Evento cuando se leen documentos de una colección"""
-    user_id: str
-    project_id: str
-    collection: str
     document_count: int
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass(frozen=True)
-class DocumentWrittenEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class DocumentWrittenEvent(ProjectScopedEvent):
     """Evento cuando se escribe/actualiza un documento"""
-    user_id: str
-    project_id: str
-    collection: str
     document_id: str
     operation: str  # "insert" | "update" | "delete"
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
 # Eventos de RAG
-@dataclass(frozen=True)
-class RagIngestStartedEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class RagIngestStartedEvent(ProjectScopedEvent):
     """Evento cuando inicia la ingesta de texto/PDF para RAG"""
-    user_id: str
-    project_id: str
-    collection: str
     source_type: str  # "text" | "pdf"
     source_size_bytes: int
     job_id: str
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass(frozen=True)
-class RagIngestCompletedEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class RagIngestCompletedEvent(ProjectScopedEvent):
     """Evento cuando completa la ingesta para RAG"""
-    user_id: str
-    project_id: str
-    collection: str
     job_id: str
     chunks_inserted: int
     embeddings_generated: int
     processing_time_ms: int
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass(frozen=True)
-class RagQueryExecutedEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class RagQueryExecutedEvent(ProjectScopedEvent):
     """Evento cuando se ejecuta una query RAG"""
-    user_id: str
-    project_id: str
-    collection: str
     query: str
     results_count: int
     response_time_ms: int
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
 # Eventos de Texto - Pipeline Asíncrono
-@dataclass(frozen=True)
-class TextIngestStartedEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class TextIngestStartedEvent(ProjectScopedEvent):
     """Evento cuando inicia la ingesta de texto plano"""
-    user_id: str
-    project_id: str
-    collection: str
     text_size_bytes: int
     job_id: str
     chunk_size: int = 500
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass(frozen=True)
-class TextChunkedEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class TextChunkedEvent(ProjectScopedEvent):
     """Evento cuando el texto se divide en chunks"""
     job_id: str
-    user_id: str
-    project_id: str
-    collection: str
     chunks: List[str]
     chunk_metadata: List[Dict[str, Any]]
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
 # Eventos de PDF - Pipeline Asíncrono
 
-@dataclass(frozen=True)
-class PdfIngestStartedEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class PdfIngestStartedEvent(ProjectScopedEvent):
     """Evento cuando inicia el procesamiento de un PDF (antes de guardar en GridFS)"""
-    user_id: str
-    project_id: str
-    collection: str
     pdf_size_bytes: int
     pdf_filename: str
     job_id: str
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass(frozen=True)
-class PdfSavedToGridFSEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class PdfSavedToGridFSEvent(ProjectScopedEvent):
     """Evento cuando el PDF se guardó exitosamente en GridFS y está listo para procesarse"""
-    user_id: str
-    project_id: str
-    collection: str
     pdf_size_bytes: int
     pdf_filename: str
     job_id: str
     content_hash: str  # Hash del PDF guardado
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass(frozen=True)
-class PdfPageExtractedEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class PdfPageExtractedEvent(ProjectScopedEvent):
     """Evento cuando se extrae UNA página (streaming incremental)"""
     job_id: str
-    user_id: str
-    project_id: str
-    collection: str
     page_number: int
     total_pages: int
     page_text: str
     page_metadata: Dict
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass(frozen=True)
-class PdfTextExtractedEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class PdfTextExtractedEvent(ProjectScopedEvent):
     """Evento cuando se extrae el texto completo (legacy)"""
     job_id: str
-    user_id: str
-    project_id: str
-    collection: str
     text: str
     pdf_metadata: Dict[str, Any]
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass(frozen=True)
-class PdfChunkedEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class PdfChunkedEvent(ProjectScopedEvent):
     """Evento cuando se divide el texto en chunks"""
     job_id: str
-    user_id: str
-    project_id: str
-    collection: str
     chunks: List[str]
     chunk_metadata: List[Dict[str, Any]]
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass(frozen=True)
-class EmbeddingsGeneratedEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class EmbeddingsGeneratedEvent(ProjectScopedEvent):
     """Evento cuando se generan embeddings"""
     job_id: str
-    user_id: str
-    project_id: str
-    collection: str
-    embeddings: List[List[float]]
+    embeddings: List[array]  # Un array('f') (float32 contiguo) por chunk
     chunks: List[str]
     metadata: List[Dict[str, Any]]
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass(frozen=True)
-class PdfIngestCompletedEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class PdfIngestCompletedEvent(ProjectScopedEvent):
     """Evento cuando completa el procesamiento de un PDF"""
-    user_id: str
-    project_id: str
-    collection: str
     job_id: str
     pages_processed: int
     chunks_created: int
     processing_time_ms: int
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass(frozen=True)
-class PdfIngestFailedEvent(DomainEvent):
+@dataclass(frozen=True, slots=True)
+class PdfIngestFailedEvent(ProjectScopedEvent):
     """Evento cuando falla el procesamiento de un PDF"""
-    user_id: str
-    project_id: str
-    collection: str
     job_id: str
     stage: str  # "extraction" | "chunking" | "embedding" | "storage"
     error_message: str
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
 # Eventos de Límites
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class UsageLimitExceededEvent(DomainEvent):
     """Evento cuando un usuario excede un límite de su plan"""
     user_id: str
@@ -223,10 +204,10 @@ class UsageLimitExceededEvent(DomainEvent):
     current_usage: int
     limit: int
     plan_name: str
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class UsageLimitWarningEvent(DomainEvent):
     """Evento cuando un usuario se acerca a un límite (80%)"""
     user_id: str
@@ -234,11 +215,11 @@ class UsageLimitWarningEvent(DomainEvent):
     current_usage: int
     limit: int
     percentage: float
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
 # Eventos de Autenticación
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class OtpCreatedEvent(DomainEvent):
     """Event when OTP is generated (in-memory) and ready to be processed"""
     otp_id: str
@@ -248,11 +229,11 @@ class OtpCreatedEvent(DomainEvent):
     otp_type: str = "login"
     user_name: Optional[str] = None
     should_send_email: bool = True
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
 # Eventos de Contacto
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ContactFormSubmittedEvent(DomainEvent):
     """Evento cuando alguien envía el formulario de contacto en la landing page"""
     name: str
@@ -262,7 +243,7 @@ class ContactFormSubmittedEvent(DomainEvent):
     company: Optional[str]
     interest: str
     plan: str
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: float = field(default_factory=time.time)
 
 
 # Deprecated: OtpRequestedEvent (Replaced by OtpCreatedEvent for full event driven flow)
@@ -0,0 +1,67 @@
+"""
+Control de admisión para endpoints costosos (SMTP, MongoDB) expuestos a abuso.
+El exceso de requests espera en cola un tiempo acotado en lugar de saturar
+el threadpool y el pool de conexiones.
+"""
+import asyncio
+import logging
+from typing import Dict
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionLimiter:
+    """
+    Limita los requests concurrentes de un grupo de endpoints.
+
+    Hasta `max_concurrent` requests se atienden a la vez; el resto espera
+    hasta `queue_timeout` segundos y, si no hay lugar, se rechaza.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+
+    async def acquire(self) -> bool:
+        """
+        Esperar un lugar (con timeout).
+
+        Returns:
+            True si se admitió el request, False si se agotó el tiempo en cola
+        """
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"⚠️ Admission rejected: group={self.name}, "
+                f"limit={self.max_concurrent}, waiting={self._waiting}"
+            )
+            return False
+        finally:
+            self._waiting -= 1
+
+    def release(self) -> None:
+        """Liberar el lugar al terminar el request"""
+        self._semaphore.release()
+
+
+# Un limiter por grupo de endpoints (compartido por todos los requests del proceso)
+_admission_limiters: Dict[str, AdmissionLimiter] = {}
+
+def get_admission_limiter(name: str) -> AdmissionLimiter:
+    """Obtener (o crear) el limiter global de un grupo de endpoints"""
+    limiter = _admission_limiters.get(name)
+    if limiter is None:
+        limiter = _admission_limiters[name] = AdmissionLimiter(
+            name,
+            max_concurrent=settings.admission_max_concurrent,
+            queue_timeout=settings.admission_queue_timeout_seconds,
+        )
+    return limiter
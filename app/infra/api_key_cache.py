@@ -0,0 +1,102 @@
+"""
+Caché en memoria con TTL para lookups por API key.
+
+Cada request autenticado (y cada reintento de login) resuelve su API key contra
+MongoDB con exactamente la misma consulta. Esta caché guarda el resultado por
+un tiempo corto para amortizar esas consultas repetidas.
+
+- Nunca guarda la API key en texto plano: se indexa por un digest blake2b.
+- Los resultados negativos (key inválida) se guardan con un TTL más corto,
+  lo que además frena el brute-force sin bloquear keys recién creadas.
+- Los lookups async concurrentes de una misma key (miss) comparten una sola
+  consulta (single-flight).
+"""
+import asyncio
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+from cachetools import TTLCache
+
+T = TypeVar("T")
+
+
+def _digest(api_key: str) -> bytes:
+    """Digest corto de la API key (clave de caché)"""
+    return hashlib.blake2b(api_key.encode(), digest_size=16).digest()
+
+
+class ApiKeyLookupCache(Generic[T]):
+    """Caché TTL thread-safe de `api_key -> entidad` (o None si la key no existe)"""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60, negative_ttl: float = 5):
+        self._found: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._not_found: TTLCache = TTLCache(maxsize=maxsize, ttl=negative_ttl)
+        self._lock = threading.Lock()
+        # Consultas en vuelo por key (solo se usa desde el event loop)
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+
+    def lookup(self, api_key: str) -> Tuple[bool, Optional[T]]:
+        """
+        Buscar una API key en caché.
+
+        Returns:
+            (hit, valor): hit=False si hay que consultar la base de datos
+        """
+        key = _digest(api_key)
+        with self._lock:
+            value = self._found.get(key)
+            if value is not None:
+                return True, value
+            if key in self._not_found:
+                return True, None
+        return False, None
+
+    async def load(self, api_key: str, loader: Callable[[], Awaitable[Optional[T]]]) -> Optional[T]:
+        """
+        Resolver una API key desde caché o, en un miss, con `loader`.
+
+        Si ya hay una consulta en vuelo para la misma key, se espera esa en
+        lugar de lanzar otra. `loader` es responsable de llamar a `store`.
+        """
+        hit, value = self.lookup(api_key)
+        if hit:
+            return value
+
+        key = _digest(api_key)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: si un request se cancela, la consulta compartida sigue para los demás
+        return await asyncio.shield(task)
+
+    def store(self, api_key: str, value: Optional[T]) -> None:
+        """Guardar el resultado de un lookup (None = key inválida)"""
+        key = _digest(api_key)
+        with self._lock:
+            if value is None:
+                self._not_found[key] = True
+            else:
+                self._not_found.pop(key, None)
+                self._found[key] = value
+
+    def discard(self, api_key: str) -> None:
+        """Eliminar el resultado (positivo o negativo) de una API key (ej. rotación)"""
+        key = _digest(api_key)
+        with self._lock:
+            self._found.pop(key, None)
+            self._not_found.pop(key, None)
+
+    def invalidate(self, predicate: Callable[[T], Any]) -> None:
+        """Eliminar las entradas cuyo valor cumpla `predicate` (ej. usuario bloqueado)"""
+        with self._lock:
+            stale = [key for key, value in self._found.items() if predicate(value)]
+            for key in stale:
+                self._found.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._found.clear()
+            self._not_found.clear()
@@ -1,37 +1,104 @@
+from datetime import timezone
 from typing import Optional
 import hashlib
 import logging
 
-from app.infra.mongo_client import get_mongo_client
+from app.infra.mongo_client import get_mongo_client, get_async_mongo_client
+from app.infra.api_key_cache import ApiKeyLookupCache
+from app.infra.user_repository import get_user_repository
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Caché de proyectos por API key (cada request con X-API-Key pasa por aquí)
+_project_key_cache: ApiKeyLookupCache[dict] = ApiKeyLookupCache(ttl=60, negative_ttl=5)
+
 
 def _hash_api_key(api_key: str) -> str:
     """Hash API key usando SHA-256 para comparación segura"""
     return hashlib.sha256(api_key.encode()).hexdigest()
 
 
+def _project_with_owner_pipeline(api_key: str) -> list:
+    """
+    Buscar por hash de API key, no por texto plano. El dueño del proyecto
+    viene en la misma consulta ($lookup): el middleware lo necesita enseguida
+    y así no cuesta un segundo round-trip.
+    """
+    return [
+        {"$match": {"api_key_hash": _hash_api_key(api_key)}},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "users",
+            "localField": "user_id",
+            "foreignField": "user_id",
+            "as": "owner",
+        }},
+        {"$project": {"_id": 0, "owner._id": 0}},
+    ]
+
+
+def _store_lookup(api_key: str, project: Optional[dict]) -> Optional[dict]:
+    """Cachear el resultado del lookup (y el dueño, en la caché de usuarios)"""
+    if project:
+        owners = project.pop("owner", None)
+        if owners:
+            get_user_repository().remember(owners[0])
+        # Expiración como epoch (una vez por llenado de caché, no en cada request)
+        expires_at = project["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        project["expires_ts"] = expires_at.timestamp()
+        logger.info(f"Project found for API key hash")
+    else:
+        logger.warning(f"No project found for provided API key")
+    _project_key_cache.store(api_key, project)
+    return project
+
+
 class ApiKeyRepository:
     def get_project_by_key(self, api_key: str) -> Optional[dict]:
+        hit, project = _project_key_cache.lookup(api_key)
+        if hit:
+            return project
+        
         client = get_mongo_client()
-        db = client[settings.mongo_meta_db]
-        collection = db["projects"]
+        collection = client[settings.mongo_meta_db]["projects"]
 
         try:
-            # Buscar por hash de API key, no por texto plano
-            api_key_hash = _hash_api_key(api_key)
-            project = collection.find_one(
-                {"api_key_hash": api_key_hash},
-                {"_id": 0}
-            )
-            if project:
-                logger.info(f"Project found for API key hash")
-            else:
-                logger.warning(f"No project found for provided API key")
-            return project
+            project = next(collection.aggregate(_project_with_owner_pipeline(api_key)), None)
+            return _store_lookup(api_key, project)
         except Exception as e:
             logger.error(f"Error fetching project by API key: {e}")
             return None
 
+    async def get_project_by_key_async(self, api_key: str) -> Optional[dict]:
+        """Versión async de get_project_by_key (no bloquea el event loop)"""
+        return await _project_key_cache.load(api_key, lambda: self._fetch_project_async(api_key))
+
+    async def _fetch_project_async(self, api_key: str) -> Optional[dict]:
+        client = get_async_mongo_client()
+        collection = client[settings.mongo_meta_db]["projects"]
+
+        try:
+            cursor = await collection.aggregate(_project_with_owner_pipeline(api_key))
+            project = next(iter(await cursor.to_list(1)), None)
+            return _store_lookup(api_key, project)
+        except Exception as e:
+            logger.error(f"Error fetching project by API key: {e}")
+            return None
+
+    def invalidate(self, api_key: str) -> None:
+        """Olvidar el lookup cacheado de una API key (llamar al rotarla o revocarla)"""
+        _project_key_cache.discard(api_key)
+
+
+# Instancia global singleton
+_api_key_repository = None
+
+def get_api_key_repository() -> ApiKeyRepository:
+    """Obtener instancia global del repositorio de API keys de proyecto"""
+    global _api_key_repository
+    if _api_key_repository is None:
+        _api_key_repository = ApiKeyRepository()
+    return _api_key_repository
@@ -1,57 +1,53 @@
 """
 Email service for sending OTP codes and notifications.
 Uses SMTP (Gmail) for email delivery.
+
+SMTP is spoken directly on the event loop (aiosmtplib). Authenticated
+sessions are pooled and reused across sends; each one is recycled after
+MAX_MESSAGES_PER_CONNECTION messages or when the server drops it.
 """
-import smtplib
+import asyncio
+import ssl
+import string
 import logging
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from email.policy import SMTP as SMTP_POLICY
+from typing import List, Optional, Tuple
+
+import aiosmtplib
 
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Up to this many SMTP sessions open at once (extra sends wait for a free one)
+SMTP_POOL_SIZE = 5
+# Recycle a session after this many messages (providers cap it anyway)
+MAX_MESSAGES_PER_CONNECTION = 100
+SMTP_TIMEOUT_SECONDS = 30
 
-class EmailService:
-    """Service for sending emails via SMTP"""
-    
-    def __init__(self):
-        self.smtp_host = settings.mail_host
-        self.smtp_port = settings.mail_port
-        self.smtp_user = settings.mail_auth
-        self.smtp_password = settings.mail_password
-        self.from_email = settings.mail_auth
-    
-    def send_otp_email(self, to_email: str, otp_code: str, user_name: Optional[str] = None) -> bool:
-        """
-        Send OTP code via email.
-        
-        Args:
-            to_email: Recipient email address
-            otp_code: 6-digit OTP code
-            user_name: Optional user name for personalization
-        
-        Returns:
-            True if email sent successfully, False otherwise
-        """
-        subject = "🔐 Tu código de verificación - SonqoBase"
-        
-        # HTML email template
-        html_body = f"""
+# Implicit TLS port: TLS starts at connect time (no STARTTLS + second EHLO)
+SMTPS_PORT = 465
+
+# Built once: loading the CA store is the expensive part of a TLS context
+_ssl_context = ssl.create_default_context()
+
+# OTP email body: static HTML, only the greeting and the code change per send
+_OTP_TEMPLATE = string.Template("""
         <!DOCTYPE html>
         <html>
         <head>
             <style>
-                body {{ font-family: Arial, sans-serif; background-color: #f4f4f4; margin: 0; padding: 0; }}
-                .container {{ max-width: 600px; margin: 40px auto; background-color: #ffffff; padding: 40px; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-                .header {{ text-align: center; margin-bottom: 30px; }}
-                .logo {{ font-size: 32px; font-weight: bold; background: linear-gradient(135deg, #00ff88 0%, #00d4ff 100%); -webkit-background-clip: text; -webkit-text-fill-color: transparent; }}
-                .otp-code {{ font-size: 36px; font-weight: bold; text-align: center; letter-spacing: 8px; color: #00ff88; background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 30px 0; }}
-                .message {{ color: #333; line-height: 1.6; margin-bottom: 20px; }}
-                .warning {{ color: #ff4444; font-size: 14px; margin-top: 20px; padding: 15px; background-color: #fff3f3; border-left: 4px solid #ff4444; }}
-                .footer {{ text-align: center; margin-top: 40px; color: #888; font-size: 12px; }}
+                body { font-family: Arial, sans-serif; background-color: #f4f4f4; margin: 0; padding: 0; }
+                .container { max-width: 600px; margin: 40px auto; background-color: #ffffff; padding: 40px; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }
+                .header { text-align: center; margin-bottom: 30px; }
+                .logo { font-size: 32px; font-weight: bold; background: linear-gradient(135deg, #00ff88 0%, #00d4ff 100%); -webkit-background-clip: text; -webkit-text-fill-color: transparent; }
+                .otp-code { font-size: 36px; font-weight: bold; text-align: center; letter-spacing: 8px; color: #00ff88; background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 30px 0; }
+                .message { color: #333; line-height: 1.6; margin-bottom: 20px; }
+                .warning { color: #ff4444; font-size: 14px; margin-top: 20px; padding: 15px; background-color: #fff3f3; border-left: 4px solid #ff4444; }
+                .footer { text-align: center; margin-top: 40px; color: #888; font-size: 12px; }
             </style>
         </head>
         <body>
@@ -61,11 +57,11 @@ class EmailService:
                 </div>
                 
                 <div class="message">
-                    <p>Hola{f" {user_name}" if user_name else ""},</p>
+                    <p>$greeting</p>
                     <p>Has solicitado acceso a tu cuenta de SonqoBase. Usa el siguiente código de verificación:</p>
                 </div>
                 
-                <div class="otp-code">{otp_code}</div>
+                <div class="otp-code">$otp_code</div>
                 
                 <div class="message">
                     <p>Este código expirará en <strong>5 minutos</strong>.</p>
@@ -83,11 +79,43 @@ class EmailService:
             </div>
         </body>
         </html>
+        """)
+
+
+class EmailService:
+    """Service for sending emails via SMTP"""
+    
+    def __init__(self):
+        self.smtp_host = settings.mail_host
+        self.smtp_port = settings.mail_port
+        self.smtp_user = settings.mail_auth
+        self.smtp_password = settings.mail_password
+        self.from_email = settings.mail_auth
+        
+        # Idle authenticated sessions, with the number of messages each has sent
+        self._idle: List[Tuple[aiosmtplib.SMTP, int]] = []
+        self._slots = asyncio.Semaphore(SMTP_POOL_SIZE)
+    
+    async def send_otp_email(self, to_email: str, otp_code: str, user_name: Optional[str] = None) -> bool:
+        """
+        Send OTP code via email.
+        
+        Args:
+            to_email: Recipient email address
+            otp_code: 6-digit OTP code
+            user_name: Optional user name for personalization
+        
+        Returns:
+            True if email sent successfully, False otherwise
         """
+        subject = "🔐 Tu código de verificación - SonqoBase"
         
-        return self._send_email(to_email, subject, html_body)
+        greeting = f"Hola {user_name}," if user_name else "Hola,"
+        html_body = _OTP_TEMPLATE.substitute(greeting=greeting, otp_code=otp_code)
+        
+        return await self._send_email(to_email, subject, html_body)
     
-    def _send_email(self, to_email: str, subject: str, html_body: str) -> bool:
+    async def _send_email(self, to_email: str, subject: str, html_body: str) -> bool:
         """
         Internal method to send email via SMTP.
         
@@ -110,11 +138,28 @@ class EmailService:
             html_part = MIMEText(html_body, "html", "utf-8")
             message.attach(html_part)
             
-            # Connect to SMTP server and send
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()  # Enable TLS
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(message)
+            # Flatten once to wire format (CRLF); a retry resends the same bytes
+            data = message.as_bytes(policy=SMTP_POLICY)
+            recipients = [to_email]
+            
+            # Send over a pooled SMTP session
+            async with self._slots:
+                smtp, sent = await self._acquire()
+                try:
+                    await smtp.sendmail(self.from_email, recipients, data)
+                except aiosmtplib.SMTPServerDisconnected:
+                    # An idle session timed out server-side: retry once on a fresh one
+                    await self._discard(smtp)
+                    smtp, sent = await self._connect(), 0
+                    try:
+                        await smtp.sendmail(self.from_email, recipients, data)
+                    except BaseException:
+                        await self._discard(smtp)
+                        raise
+                except BaseException:
+                    await self._discard(smtp)
+                    raise
+                self._idle.append((smtp, sent + 1))
             
             logger.info(f"✅ Email sent successfully to {to_email}")
             return True
@@ -122,6 +167,44 @@ class EmailService:
         except Exception as e:
             logger.error(f"❌ Failed to send email to {to_email}: {e}")
             return False
+    
+    async def _connect(self) -> aiosmtplib.SMTP:
+        """Open a new authenticated SMTP session (implicit TLS on 465, STARTTLS otherwise)"""
+        implicit_tls = self.smtp_port == SMTPS_PORT
+        smtp = aiosmtplib.SMTP(
+            hostname=self.smtp_host,
+            port=self.smtp_port,
+            use_tls=implicit_tls,
+            start_tls=not implicit_tls,
+            tls_context=_ssl_context,
+            timeout=SMTP_TIMEOUT_SECONDS,
+        )
+        await smtp.connect()
+        await smtp.login(self.smtp_user, self.smtp_password)
+        return smtp
+    
+    async def _acquire(self) -> Tuple[aiosmtplib.SMTP, int]:
+        """Take an idle session that is still usable, or open a new one"""
+        while self._idle:
+            smtp, sent = self._idle.pop()
+            if smtp.is_connected and sent < MAX_MESSAGES_PER_CONNECTION:
+                return smtp, sent
+            await self._discard(smtp)
+        return await self._connect(), 0
+    
+    async def _discard(self, smtp: aiosmtplib.SMTP) -> None:
+        """Close a session that will not be reused"""
+        try:
+            if smtp.is_connected:
+                await smtp.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            smtp.close()
+    
+    async def close(self) -> None:
+        """Close all idle sessions (on shutdown)"""
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            await self._discard(smtp)
 
 
 # Singleton instance
@@ -133,3 +216,9 @@ def get_email_service() -> EmailService:
     if _email_service is None:
         _email_service = EmailService()
     return _email_service
+
+
+async def close_email_service() -> None:
+    """Close the pooled SMTP sessions, if the service was ever used"""
+    if _email_service is not None:
+        await _email_service.close()
@@ -1,18 +1,35 @@
 """
 Event Bus para publicar y suscribirse a eventos de dominio.
 Similar a ApplicationEventPublisher de Spring Boot.
+
+publish solo encola el evento: un pequeño grupo de workers lo reparte a los
+listeners, así el costo para quien publica no depende de cuántos haya.
 """
-from typing import Callable, Dict, List, Type, TypeVar
+from typing import Callable, Dict, List, Optional, Set, Tuple, Type, TypeVar
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
 import asyncio
 import logging
 
+from app.config import settings
 from app.domain.events import DomainEvent
 
 T = TypeVar('T', bound=DomainEvent)
 
 logger = logging.getLogger(__name__)
 
+# Eventos en cola antes de que publish empiece a esperar (back-pressure)
+EVENT_QUEUE_MAXSIZE = 10_000
+# Workers que reparten los eventos de la cola a los listeners
+EVENT_WORKERS = 4
+# Hilos para listeners síncronos (no corren en el thread del event loop)
+SYNC_LISTENER_THREADS = 4
+
+# True dentro de un listener asíncrono (y de las tareas que lance): ese código
+# tiene un lugar del semáforo, así que publish no debe quedarse esperando cola
+_in_listener: ContextVar[bool] = ContextVar("event_bus_in_listener", default=False)
+
 
 class EventBus:
     """
@@ -20,7 +37,7 @@ class EventBus:
     
     Características:
     - Suscripción basada en decoradores
-    - Listeners asíncronos ejecutados en paralelo
+    - Listeners asíncronos ejecutados en paralelo (acotado por event_bus_concurrency)
     - Manejo de errores sin afectar otros listeners
     - Type-safe con generics
     """
@@ -30,6 +47,22 @@ class EventBus:
         self._async_listeners: Dict[Type[DomainEvent], List[Callable]] = defaultdict(list)
         # Dict[EventType, List[SyncListener]]
         self._sync_listeners: Dict[Type[DomainEvent], List[Callable]] = defaultdict(list)
+        # Tareas de listeners en curso (el loop solo guarda referencias débiles)
+        self._pending_tasks: Set[asyncio.Task] = set()
+        # Tope de listeners asíncronos en ejecución: una ráfaga de eventos no
+        # dispara cientos de llamadas a Mongo/Gemini/SMTP a la vez
+        self._semaphore = asyncio.Semaphore(settings.event_bus_concurrency or 64)
+        # Dict[EventType, (listeners síncronos, listeners asíncronos)] ya resueltos
+        # para publish; se invalida al suscribir
+        self._combined: Dict[Type[DomainEvent], Tuple[Tuple[Callable, ...], Tuple[Callable, ...]]] = {}
+        # Cola y workers de despacho (se crean en el primer publish, dentro del loop)
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        # Tras close() no se vuelven a lanzar workers
+        self._closed = False
+        # Un listener síncrono lento no frena el loop ni el despacho de otros eventos
+        # (se crea al suscribirse el primer listener síncrono)
+        self._sync_executor: Optional[ThreadPoolExecutor] = None
     
     def subscribe(
         self, 
@@ -54,43 +87,139 @@ class EventBus:
                 self._async_listeners[event_type].append(handler)
                 logger.info(f"✅ Registered async listener for {event_type.__name__}")
             else:
+                if self._sync_executor is None:
+                    self._sync_executor = ThreadPoolExecutor(
+                        max_workers=SYNC_LISTENER_THREADS, thread_name_prefix="event-bus-sync"
+                    )
                 self._sync_listeners[event_type].append(handler)
                 logger.info(f"✅ Registered sync listener for {event_type.__name__}")
+            self._combined.pop(event_type, None)
             return handler
         return decorator
     
     async def publish(self, event: DomainEvent):
         """
         Publicar un evento a todos los listeners registrados.
-        Los listeners asíncronos se ejecutan en paralelo.
+        El evento se encola y lo despachan los workers del bus: los listeners
+        se ejecutan después (en paralelo, acotados por el semáforo).
         Los errores en listeners no afectan la operación principal.
         
         Args:
             event: Evento de dominio a publicar
         """
-        event_type = type(event)
+        if self._closed:
+            logger.warning(f"⚠️ Event bus closed, dropping {type(event).__name__}")
+            return
+        if self._queue is None:
+            self._start_workers()
         
-        # Ejecutar listeners síncronos
-        for listener in self._sync_listeners.get(event_type, []):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            if _in_listener.get():
+                # Publicado desde un listener: esperar aquí retendría su lugar del
+                # semáforo, que los workers necesitan para vaciar la cola (deadlock).
+                # El evento espera lugar en una tarea aparte y el listener termina
+                self._track(asyncio.create_task(self._queue.put(event)))
+                return
+            # Cola llena: quien publica espera a que los workers hagan lugar
+            logger.warning(f"⚠️ Event queue full ({EVENT_QUEUE_MAXSIZE}), waiting to publish {type(event).__name__}")
+            await self._queue.put(event)
+    
+    def _track(self, task: asyncio.Task):
+        """Guardar referencia a una tarea del bus hasta que termine (close la espera)"""
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._pending_tasks.discard)
+    
+    def _start_workers(self):
+        """Crear la cola y lanzar los workers de despacho"""
+        self._queue = asyncio.Queue(maxsize=EVENT_QUEUE_MAXSIZE)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(EVENT_WORKERS)]
+    
+    async def _worker(self):
+        """Consumir eventos de la cola hasta recibir el centinela (None)"""
+        while True:
+            event = await self._queue.get()
+            if event is None:
+                self._queue.task_done()
+                return
             try:
-                listener(event)
+                await self._dispatch(event)
             except Exception as e:
-                logger.error(f"❌ Error in sync listener for {event_type.__name__}: {e}")
+                logger.error(f"❌ Error dispatching {type(event).__name__}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+    
+    async def _dispatch(self, event: DomainEvent):
+        """Ejecutar los listeners de un evento"""
+        event_type = type(event)
+        sync_fns, async_fns = self._combined.get(event_type) or self._build_cache(event_type)
+        
+        # Ejecutar listeners síncronos en el pool de hilos del bus
+        if sync_fns:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(
+                loop.run_in_executor(self._sync_executor, self._safe_sync_call, listener, event)
+                for listener in sync_fns
+            ))
         
-        # Ejecutar listeners asíncronos en paralelo (Fire-and-forget)
-        # No esperamos a que terminen para no bloquear el flujo principal (ej. respuesta HTTP)
-        for listener in self._async_listeners.get(event_type, []):
-            asyncio.create_task(self._safe_async_call(listener, event))
+        # Ejecutar listeners asíncronos en paralelo (Fire-and-forget).
+        # El lugar en el semáforo se toma antes de crear la tarea: si todos están
+        # ocupados el worker espera y la cola hace de back-pressure
+        for listener in async_fns:
+            await self._semaphore.acquire()
+            self._track(asyncio.create_task(self._safe_async_call(listener, event)))
+    
+    async def close(self):
+        """Despachar los eventos encolados y esperar a los listeners en curso (al apagar)"""
+        if self._queue is not None:
+            # Los listeners en curso pueden publicar más eventos: repetir hasta
+            # que no quede nada en cola ni en ejecución
+            while True:
+                await self._queue.join()
+                if not self._pending_tasks:
+                    break
+                await asyncio.gather(*self._pending_tasks, return_exceptions=True)
             
-        # NOTA: Al usar create_task, si hay errores no manejados en _safe_async_call,
-        # solo se loguearán pero no se propagarán al caller. Esto es deseado para eventos.
+            self._closed = True
+            for _ in self._workers:
+                self._queue.put_nowait(None)
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._queue, self._workers = None, []
+        self._closed = True
+        
+        if self._sync_executor is not None:
+            await asyncio.to_thread(self._sync_executor.shutdown, wait=True)
+            self._sync_executor = None
+    
+    def _build_cache(
+        self, event_type: Type[DomainEvent]
+    ) -> Tuple[Tuple[Callable, ...], Tuple[Callable, ...]]:
+        """Resolver (y guardar) los listeners de un tipo de evento para publish"""
+        entry = (
+            tuple(self._sync_listeners.get(event_type, ())),
+            tuple(self._async_listeners.get(event_type, ())),
+        )
+        self._combined[event_type] = entry
+        return entry
+    
+    def _safe_sync_call(self, listener: Callable, event: DomainEvent):
+        """Ejecutar listener síncrono con manejo de errores"""
+        try:
+            listener(event)
+        except Exception as e:
+            logger.error(f"❌ Error in sync listener for {type(event).__name__}: {e}")
     
     async def _safe_async_call(self, listener: Callable, event: DomainEvent):
-        """Ejecutar listener con manejo de errores"""
+        """Ejecutar listener con manejo de errores (libera el lugar tomado en _dispatch)"""
+        # La tarea corre en su propia copia del contexto: no afecta a otros listeners
+        _in_listener.set(True)
         try:
             await listener(event)
         except Exception as e:
             logger.error(f"❌ Error in async listener for {type(event).__name__}: {e}", exc_info=True)
+        finally:
+            self._semaphore.release()
     
     def publish_sync(self, event: DomainEvent):
         """
@@ -130,3 +259,8 @@ _event_bus = EventBus()
 def get_event_bus() -> EventBus:
     """Obtener instancia global del event bus"""
     return _event_bus
+
+
+async def close_event_bus() -> None:
+    """Vaciar la cola de eventos del bus global (al apagar)"""
+    await _event_bus.close()
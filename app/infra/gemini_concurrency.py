@@ -0,0 +1,10 @@
+"""
+Tope de requests a la API de Gemini en vuelo por proceso.
+Embeddings y generación comparten la misma cuota de la API key, así que
+comparten también el semáforo.
+"""
+import asyncio
+
+from app.config import settings
+
+gemini_inflight_requests = asyncio.Semaphore(settings.gemini_max_concurrency or 8)
@@ -1,38 +1,175 @@
-from concurrent.futures import ThreadPoolExecutor
-from typing import List
+from typing import List, Optional, Set, Tuple
 from google import genai
 from google.genai import types
 
+from app.config import settings
 from app.domain.embeddings import EmbeddingProvider
+from app.infra.gemini_concurrency import gemini_inflight_requests
 import asyncio
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+# Máximo de textos por request de embed_content (límite de la API de Gemini)
+MAX_BATCH_SIZE = 100
+# Requests de embeddings en vuelo a la vez por llamada a embed_batch
+MAX_CONCURRENT_REQUESTS = 5
+# embed() concurrentes (queries RAG) que llegan dentro de esta ventana se
+# agrupan en una sola llamada a embed_content, de hasta MAX_COALESCED_TEXTS textos
+COALESCE_WINDOW_SECONDS = 0.005
+MAX_COALESCED_TEXTS = 64
+
+
+class EmbeddingCountMismatch(Exception):
+    """La API devolvió una cantidad de embeddings distinta a la de textos enviados"""
+
 
 class GeminiEmbeddingProvider(EmbeddingProvider):
     def __init__(self, api_key: str):
+        # client.aio usa un cliente HTTP async propio (keep-alive entre llamadas):
+        # sin hilos por request y reutilizando conexiones TCP/TLS
         self.client = genai.Client(api_key=api_key)
-        self.executor = ThreadPoolExecutor()
+        # Textos de embed() esperando lote, con el future de cada caller
+        # (la cola y el batcher se crean en el primer embed, dentro del loop)
+        self._pending: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
 
     async def embed(self, text: str) -> List[float]:
         """Genera embedding de un texto y devuelve lista de floats"""
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            self.executor,
-            lambda: self.client.models.embed_content(
-                model="gemini-embedding-001",
-                contents=[text],
-                config=types.EmbedContentConfig(output_dimensionality=768)
+        # Un texto vacío haría fallar el lote entero con el que se agrupe
+        if not text or not text.strip():
+            raise ValueError("Text to embed must not be empty")
+        
+        if self._pending is None:
+            self._pending = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._coalesce())
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending.put_nowait((text, future))
+        return await future
+
+    async def _coalesce(self):
+        """Juntar los embed() que llegan en la misma ventana y resolverlos con un request"""
+        while True:
+            batch: List[Tuple[str, asyncio.Future]] = [await self._pending.get()]
+            # Un embed() solo, sin nada en vuelo, sale ya: la ventana solo se paga con carga
+            if not self._pending.empty() or self._batch_tasks:
+                await asyncio.sleep(COALESCE_WINDOW_SECONDS)
+            while len(batch) < MAX_COALESCED_TEXTS and not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+            
+            # El request corre aparte: el batcher sigue juntando el próximo lote
+            task = asyncio.create_task(self._resolve_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _resolve_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Embeber un lote y entregar cada vector (o el error) a su caller"""
+        try:
+            embeddings = await self._embed_texts([text for text, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            if len(batch) == 1:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            # El lote mezcla queries de distintos proyectos: se reintenta cada texto
+            # por separado para que el error le llegue solo a quien lo causó
+            logger.warning(f"⚠️ Coalesced embedding batch of {len(batch)} failed, retrying one by one: {e}")
+            await asyncio.gather(*(self._resolve_batch([item]) for item in batch))
+            return
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+    async def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """_embed_request verificando que venga un vector por texto"""
+        embeddings = await self._embed_request(texts)
+        # Sin esto, zip dejaría callers sin vector esperando para siempre
+        if len(embeddings) != len(texts):
+            raise EmbeddingCountMismatch(
+                f"Gemini returned {len(embeddings)} embeddings for {len(texts)} texts"
             )
-        )
-        return result.embeddings[0].values
-
-    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        """Genera embeddings de varios textos a la vez"""
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            self.executor,
-            lambda: self.client.models.embed_content(
+        return embeddings
+
+    async def aclose(self):
+        """Detener el batcher y los requests en curso (al apagar); sus callers reciben CancelledError"""
+        if self._batcher is not None:
+            self._batcher.cancel()
+            tasks = [self._batcher, *self._batch_tasks]
+            for task in self._batch_tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Textos que quedaron en cola sin llegar a un lote
+        while self._pending is not None and not self._pending.empty():
+            _, future = self._pending.get_nowait()
+            future.cancel()
+        
+        self._pending = None
+        self._batcher = None
+
+    async def embed_batch(
+        self, texts: List[str], batch_size: int = MAX_BATCH_SIZE
+    ) -> List[List[float]]:
+        """
+        Genera embeddings de varios textos con una llamada a la API por lote.
+        
+        Args:
+            texts: Textos a embeber
+            batch_size: Textos por llamada (se acota a MAX_BATCH_SIZE)
+        
+        Returns:
+            Embeddings en el mismo orden que `texts`
+        """
+        batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        if len(texts) <= batch_size:
+            return await self._embed_request(texts) if texts else []
+
+        # Varios lotes: se lanzan en paralelo (acotado) y gather conserva el orden
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async def embed_slice(start: int) -> List[List[float]]:
+            async with semaphore:
+                # Jitter para no disparar todos los lotes a la vez (evita ráfagas de 429)
+                await asyncio.sleep(random.random() * 0.02)
+                return await self._embed_request(texts[start:start + batch_size])
+
+        batches = await asyncio.gather(*[
+            embed_slice(start) for start in range(0, len(texts), batch_size)
+        ])
+        return [embedding for batch in batches for embedding in batch]
+
+    async def _embed_request(self, texts: List[str]) -> List[List[float]]:
+        """Una sola llamada a embed_content con hasta MAX_BATCH_SIZE textos"""
+        # Tope global del proceso: varias ingestas y RAG comparten la cuota de Gemini
+        async with gemini_inflight_requests:
+            result = await self.client.aio.models.embed_content(
                 model="gemini-embedding-001",
                 contents=texts,
                 config=types.EmbedContentConfig(output_dimensionality=768)
             )
-        )
         return [e.values for e in result.embeddings]
+
+
+# Instancia global singleton (un cliente Gemini y su pool de conexiones por proceso)
+_embedding_provider = None
+
+def get_embedding_provider() -> GeminiEmbeddingProvider:
+    """Obtener instancia global del provider de embeddings"""
+    global _embedding_provider
+    if _embedding_provider is None:
+        _embedding_provider = GeminiEmbeddingProvider(settings.gemini_api_key)
+    return _embedding_provider
+
+
+async def close_embedding_provider() -> None:
+    """Detener el batcher de embed() del provider global, si se llegó a crear"""
+    if _embedding_provider is not None:
+        await _embedding_provider.aclose()
@@ -1,32 +1,40 @@
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from google import genai
 from google.genai import types
+from app.config import settings
 from app.domain.llm import LLMProvider
+from app.infra.gemini_concurrency import gemini_inflight_requests
 
 class GeminiLLMProvider(LLMProvider):
     def __init__(self, api_key: str, model: str = "gemini-2.5-flash"):
+        # client.aio reutiliza su cliente HTTP async entre llamadas (sin hilos por request)
         self.client = genai.Client(api_key=api_key)
         self.model = model
-        self.executor = ThreadPoolExecutor()
 
     async def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        loop = asyncio.get_event_loop()
-
-        def _call():
+        # Comparte el tope de requests en vuelo con los embeddings (misma cuota)
+        async with gemini_inflight_requests:
             if system_prompt:
                 config = types.GenerateContentConfig(system_instruction=system_prompt)
-                response = self.client.models.generate_content(
+                response = await self.client.aio.models.generate_content(
                     model=self.model,
                     config=config,
                     contents=prompt
                 )
             else:
-                response = self.client.models.generate_content(
+                response = await self.client.aio.models.generate_content(
                     model=self.model,
                     contents=prompt
                 )
-            return response.text
+        return response.text
+
+
+# Instancia global singleton (un cliente Gemini y su pool de conexiones por proceso)
+_llm_provider = None
 
-        return await loop.run_in_executor(self.executor, _call)
+def get_llm_provider() -> GeminiLLMProvider:
+    """Obtener instancia global del provider LLM"""
+    global _llm_provider
+    if _llm_provider is None:
+        _llm_provider = GeminiLLMProvider(settings.gemini_api_key)
+    return _llm_provider
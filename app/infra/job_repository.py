@@ -5,11 +5,23 @@ import logging
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
 
-from app.infra.mongo_client import get_mongo_client
+from app.infra.mongo_client import get_mongo_client, get_async_mongo_client
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Campos que necesita el listado de jobs (ListUserJobsService)
+JOB_LIST_PROJECTION = {
+    "_id": 0,
+    "job_id": 1,
+    "type": 1,
+    "status": 1,
+    "progress": 1,
+    "collection": 1,
+    "created_at": 1,
+    "completed_at": 1,
+}
+
 
 class JobRepository:
     """
@@ -21,6 +33,9 @@ class JobRepository:
         meta_db = client[settings.mongo_meta_db]
         self.collection = meta_db['jobs']
         
+        # Misma colección vía cliente async, para lecturas desde endpoints async
+        self.async_collection = get_async_mongo_client()[settings.mongo_meta_db]['jobs']
+        
         # Crear índices
         self.collection.create_index("job_id", unique=True)
         self.collection.create_index("user_id")
@@ -91,6 +106,10 @@ class JobRepository:
         job = self.collection.find_one({"job_id": job_id}, {"_id": 0})
         return job
     
+    async def get_async(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Versión async de get (no bloquea el event loop)"""
+        return await self.async_collection.find_one({"job_id": job_id}, {"_id": 0})
+    
     def update_status(
         self,
         job_id: str,
@@ -235,7 +254,7 @@ class JobRepository:
             status: Filtrar por estado (opcional)
         
         Returns:
-            Lista de jobs
+            Lista de jobs (solo los campos de JOB_LIST_PROJECTION)
         """
         query = {"user_id": user_id}
         if status:
@@ -243,13 +262,32 @@ class JobRepository:
         
         jobs = list(
             self.collection
-            .find(query, {"_id": 0})
+            .find(query, JOB_LIST_PROJECTION)
             .sort("created_at", -1)
             .limit(limit)
         )
         
         return jobs
     
+    async def get_user_jobs_async(
+        self,
+        user_id: str,
+        limit: int = 10,
+        status: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Versión async de get_user_jobs (no bloquea el event loop)"""
+        query = {"user_id": user_id}
+        if status:
+            query["status"] = status
+        
+        cursor = (
+            self.async_collection
+            .find(query, JOB_LIST_PROJECTION)
+            .sort("created_at", -1)
+            .limit(limit)
+        )
+        return await cursor.to_list(length=limit)
+    
     def find_by_filter(
         self,
         filter_query: Dict[str, Any],
@@ -276,3 +314,14 @@ class JobRepository:
         
         logger.info(f"Found {len(jobs)} jobs matching filter")
         return jobs
+
+
+# Instancia global singleton (los índices se crean una sola vez por proceso)
+_job_repository = None
+
+def get_job_repository() -> JobRepository:
+    """Obtener instancia global del repositorio de jobs"""
+    global _job_repository
+    if _job_repository is None:
+        _job_repository = JobRepository()
+    return _job_repository
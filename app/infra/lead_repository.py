@@ -96,3 +96,14 @@ class LeadRepository:
         )
         
         return result.modified_count > 0
+
+
+# Instancia global singleton (comparte el MongoClient del proceso)
+_lead_repository = None
+
+def get_lead_repository() -> LeadRepository:
+    """Obtener instancia global del repositorio de leads"""
+    global _lead_repository
+    if _lead_repository is None:
+        _lead_repository = LeadRepository()
+    return _lead_repository
@@ -71,3 +71,14 @@ class MasterKeyRepository:
             created_at=created_at,
             is_active=doc.get("is_active", True),
         )
+
+
+# Instancia global singleton (comparte el MongoClient del proceso)
+_master_key_repository = None
+
+def get_master_key_repository() -> MasterKeyRepository:
+    """Obtener instancia global del repositorio de Master Keys"""
+    global _master_key_repository
+    if _master_key_repository is None:
+        _master_key_repository = MasterKeyRepository()
+    return _master_key_repository
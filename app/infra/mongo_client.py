@@ -1,11 +1,32 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient
 from app.config import settings
 
 _client: MongoClient | None = None
+_async_client: AsyncMongoClient | None = None
+
+
+def _client_options() -> dict:
+    """Opciones de pool y compresión de red comunes a ambos clientes"""
+    return {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "compressors": settings.mongo_compressors,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "waitQueueTimeoutMS": settings.mongo_wait_queue_timeout_ms,
+        "retryReads": True,
+    }
 
 
 def get_mongo_client() -> MongoClient:
     global _client
     if _client is None:
-        _client = MongoClient(settings.mongo_uri)
+        _client = MongoClient(settings.mongo_uri, **_client_options())
     return _client
+
+
+def get_async_mongo_client() -> AsyncMongoClient:
+    """Cliente async nativo de PyMongo (reemplazo oficial de Motor) para rutas async"""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncMongoClient(settings.mongo_uri, **_client_options())
+    return _async_client
@@ -2,12 +2,14 @@
 OTP Repository for managing OTP codes in MongoDB.
 """
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Optional
-from pymongo import MongoClient
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from cryptography.fernet import Fernet
 
 from app.config import get_settings
+from app.infra.mongo_client import get_async_mongo_client, get_mongo_client
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -17,9 +19,11 @@ class OTPRepository:
     """Repository for OTP operations"""
     
     def __init__(self):
-        self.client = MongoClient(settings.mongo_uri)
+        self.client = get_mongo_client()
         self.db = self.client[settings.mongo_meta_db]
         self.collection = self.db["otps"]
+        # One counter document per user for the login OTP rate limit
+        self.rate_limits = self.db["otp_rate_limits"]
         
         # Initialize Fernet cipher for encryption
         self.cipher = Fernet(settings.encryption_key.encode())
@@ -32,6 +36,8 @@ class OTPRepository:
         try:
             # Index on user_id for fast lookups
             self.collection.create_index("user_id")
+            # Compound index for per-user lookups sorted by creation time
+            self.collection.create_index([("user_id", 1), ("created_at", -1)])
             # Index on email
             self.collection.create_index("email")
             # TTL index to auto-delete expired OTPs (60 seconds)
@@ -52,6 +58,16 @@ class OTPRepository:
                     logger.error(f"Failed to fix index conflict: {retry_error}")
             else:
                 logger.warning(f"Failed to create indexes: {e}")
+        
+        # Separate block: a failure on the otps indexes above must not skip these.
+        # The unique index is what keeps concurrent first upserts in
+        # consume_otp_quota_async from creating duplicate counter documents
+        try:
+            # Rate-limit counters: one per user, dropped once the 1h window is over
+            self.rate_limits.create_index("user_id", unique=True)
+            self.rate_limits.create_index("window_start", expireAfterSeconds=3600)
+        except Exception as e:
+            logger.error(f"Failed to create OTP rate-limit indexes: {e}")
     
     def _encrypt_code(self, code: str) -> str:
         """Encrypt OTP code"""
@@ -226,8 +242,6 @@ class OTPRepository:
         Returns:
             Number of OTPs created in the time period
         """
-        from datetime import timedelta
-        
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
         
         count = self.collection.count_documents({
@@ -237,3 +251,73 @@ class OTPRepository:
         
         logger.debug(f"User {user_id} has {count} OTPs in last {hours} hour(s)")
         return count
+    
+    async def consume_otp_quota_async(self, user_id: str, limit: int = 3, hours: int = 1) -> bool:
+        """
+        Atomically take one OTP slot from the user's rate-limit window.
+        Check and increment happen in a single find_one_and_update, so two
+        concurrent logins can no longer both read count=2 and both proceed.
+        
+        Args:
+            user_id: User ID
+            limit: Max OTPs allowed per window
+            hours: Window length in hours
+        
+        Returns:
+            True if the slot was granted, False if the limit is exhausted
+        """
+        now = datetime.now(timezone.utc)
+        window_expired = {"$lt": ["$window_start", now - timedelta(hours=hours)]}
+        # Pipeline update: restart the window if it is over (or missing), otherwise increment
+        update = [{
+            "$set": {
+                "count": {"$cond": [window_expired, 1, {"$add": ["$count", 1]}]},
+                "window_start": {"$cond": [window_expired, now, "$window_start"]},
+            }
+        }]
+        
+        rate_limits = get_async_mongo_client()[settings.mongo_meta_db]["otp_rate_limits"]
+        try:
+            doc = await rate_limits.find_one_and_update(
+                {"user_id": user_id},
+                update,
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Two first-time upserts raced on the unique index: the retry updates the winner's doc
+            doc = await rate_limits.find_one_and_update(
+                {"user_id": user_id},
+                update,
+                return_document=ReturnDocument.AFTER,
+            )
+        
+        if doc["count"] > limit:
+            await self.release_otp_quota_async(user_id)
+            logger.debug(f"User {user_id} exhausted OTP quota ({limit} per {hours} hour(s))")
+            return False
+        return True
+    
+    async def release_otp_quota_async(self, user_id: str) -> None:
+        """
+        Give back a slot taken by consume_otp_quota_async (rejected or failed request).
+        
+        Args:
+            user_id: User ID
+        """
+        rate_limits = get_async_mongo_client()[settings.mongo_meta_db]["otp_rate_limits"]
+        await rate_limits.update_one(
+            {"user_id": user_id, "count": {"$gt": 0}},
+            {"$inc": {"count": -1}}
+        )
+
+
+# Singleton instance (avoids index creation and cipher setup per request)
+_otp_repository = None
+
+def get_otp_repository() -> OTPRepository:
+    """Get singleton instance of OTPRepository"""
+    global _otp_repository
+    if _otp_repository is None:
+        _otp_repository = OTPRepository()
+    return _otp_repository
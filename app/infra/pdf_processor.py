@@ -3,12 +3,119 @@ Procesador de PDFs con streaming real usando pypdf.
 Más compatible que PyMuPDF con diferentes tipos de PDFs.
 """
 from pypdf import PdfReader
-from typing import List, Dict, Any, Generator
+from typing import List, Dict, Any, AsyncIterator, Generator, Optional
+import asyncio
 import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 
 logger = logging.getLogger(__name__)
 
+# Páginas por tarea del pool: rangos chicos permiten publicar las primeras
+# páginas mientras el resto se sigue extrayendo
+PAGES_PER_TASK = 8
+# Rangos en vuelo por proceso: acota lo que espera en memoria a ser publicado
+TASKS_PER_WORKER = 2
+
+
+def _page_data(page, page_num: int, total_pages: int) -> Dict[str, Any]:
+    """Texto y metadata de una página (formato de los eventos de página)"""
+    page_text = page.extract_text()
+    
+    # Metadata de la página
+    page_box = page.mediabox
+    page_metadata = {
+        'width': float(page_box.width),
+        'height': float(page_box.height),
+        'page_number': page_num,
+        'total_pages': total_pages,
+    }
+    
+    # Log para diagnóstico
+    text_len = len(page_text) if page_text else 0
+    logger.debug(f"Page {page_num}: {text_len} chars")
+    
+    return {
+        'page_number': page_num,
+        'total_pages': total_pages,
+        'text': page_text or "",  # Asegurar que nunca sea None
+        'metadata': page_metadata
+    }
+
+
+def count_pages(pdf_bytes: bytes) -> int:
+    """Número de páginas del PDF (solo lee la estructura, no extrae texto)"""
+    return len(PdfReader(BytesIO(pdf_bytes)).pages)
+
+
+def extract_page_range(pdf_path: str, start: int, stop: int) -> List[Dict[str, Any]]:
+    """
+    Extraer las páginas [start, stop) (base 0) de un PDF en disco.
+    
+    Función de módulo para poder ejecutarse en un ProcessPoolExecutor:
+    cada worker abre el archivo (no se serializa el PDF entero a cada
+    proceso), lo parsea una vez y extrae un rango contiguo.
+    """
+    reader = PdfReader(pdf_path)
+    total_pages = len(reader.pages)
+    return [
+        _page_data(reader.pages[index], index + 1, total_pages)
+        for index in range(start, min(stop, total_pages))
+    ]
+
+
+def _write_temp_pdf(pdf_bytes: bytes) -> str:
+    """Volcar el PDF a un archivo temporal para compartirlo con los procesos"""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(pdf_bytes)
+        return tmp.name
+
+
+# Pool de procesos compartido para extraer texto (CPU-bound, no escala con hilos por el GIL)
+_pdf_process_pool: Optional[ProcessPoolExecutor] = None
+_pdf_process_workers = 1
+
+
+def start_pdf_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Crear el pool global de procesos (al arrancar).
+    
+    Los procesos se lanzan con forkserver (spawn en Windows): hacer fork del
+    servidor, que ya tiene hilos (event bus, MongoDB, anyio), puede dejar
+    locks tomados en el hijo.
+    
+    Args:
+        max_workers: Procesos por worker web (se acota a los CPUs disponibles)
+    """
+    global _pdf_process_pool, _pdf_process_workers
+    if _pdf_process_pool is None:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _pdf_process_workers = max(1, min(max_workers, os.cpu_count() or 1))
+        _pdf_process_pool = ProcessPoolExecutor(
+            max_workers=_pdf_process_workers,
+            mp_context=multiprocessing.get_context(method),
+        )
+        logger.info(f"🧮 PDF process pool started: {_pdf_process_workers} workers ({method})")
+    return _pdf_process_pool
+
+
+def get_pdf_process_pool() -> ProcessPoolExecutor:
+    """Obtener el pool global de procesos (lo crea si no se inició al arrancar, ej. scripts)"""
+    if _pdf_process_pool is None:
+        return start_pdf_process_pool(1)
+    return _pdf_process_pool
+
+
+def shutdown_pdf_process_pool() -> None:
+    """Terminar los procesos del pool (al apagar; bloquea hasta que salen)"""
+    global _pdf_process_pool
+    if _pdf_process_pool is not None:
+        _pdf_process_pool.shutdown(wait=True, cancel_futures=True)
+        _pdf_process_pool = None
+
 
 class PdfProcessor:
     """
@@ -39,37 +146,67 @@ class PdfProcessor:
         
         # Procesar página por página
         for page_num, page in enumerate(reader.pages, start=1):
-            # Extraer texto de esta página
-            page_text = page.extract_text()
-            
-            # Metadata de la página
-            page_box = page.mediabox
-            page_metadata = {
-                'width': float(page_box.width),
-                'height': float(page_box.height),
-                'page_number': page_num,
-                'total_pages': total_pages,
-            }
-            
-            # Log para diagnóstico
-            text_len = len(page_text) if page_text else 0
-            logger.debug(f"Page {page_num}: {text_len} chars")
-            
-            yield {
-                'page_number': page_num,
-                'total_pages': total_pages,
-                'text': page_text or "",  # Asegurar que nunca sea None
-                'metadata': page_metadata
-            }
-            
-            # Liberar página
-            del page_text
+            yield _page_data(page, page_num, total_pages)
         
         # Liberar PDF
         del pdf_bytes
         import gc
         gc.collect()
     
+    async def extract_pages_parallel(
+        self, pdf_bytes: bytes, total_pages: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Extraer las páginas repartiendo rangos contiguos entre procesos.
+        
+        Los rangos se entregan en orden a medida que terminan: los que acaban
+        antes que el siguiente esperado quedan en el buffer (sus futures) y
+        solo hay TASKS_PER_WORKER rangos por proceso en vuelo, así que un PDF
+        grande nunca está entero en memoria.
+        
+        Args:
+            pdf_bytes: Bytes del PDF
+            total_pages: Número de páginas (de count_pages)
+        
+        Yields:
+            Páginas en orden, con el mismo formato que extract_pages_streaming
+        """
+        pool = get_pdf_process_pool()
+        loop = asyncio.get_running_loop()
+        starts = iter(range(0, total_pages, PAGES_PER_TASK))
+        
+        # Cada proceso recibe la ruta del archivo, no una copia de los bytes
+        pdf_path = await asyncio.to_thread(_write_temp_pdf, pdf_bytes)
+        del pdf_bytes
+        
+        # Buffer de reordenamiento: rango pendiente por página inicial, en orden
+        pending: Dict[int, asyncio.Future] = {}
+        
+        def submit_next() -> None:
+            start = next(starts, None)
+            if start is not None:
+                pending[start] = loop.run_in_executor(
+                    pool, extract_page_range, pdf_path, start, start + PAGES_PER_TASK
+                )
+        
+        try:
+            for _ in range(_pdf_process_workers * TASKS_PER_WORKER):
+                submit_next()
+            
+            while pending:
+                # El rango más antiguo es el siguiente en orden
+                start = next(iter(pending))
+                page_range = await pending.pop(start)
+                submit_next()
+                for page in page_range:
+                    yield page
+        finally:
+            for future in pending.values():
+                future.cancel()
+            await asyncio.to_thread(os.remove, pdf_path)
+        
+        logger.info(f"📄 PDF extracted in parallel: {total_pages} pages, {_pdf_process_workers} workers")
+    
     def extract_text(self, pdf_bytes: bytes) -> str:
         """
         Extraer todo el texto del PDF (legacy).
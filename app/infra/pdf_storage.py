@@ -1,6 +1,7 @@
 """
 Content-Addressable Storage para PDFs usando MongoDB GridFS con deduplicación.
 """
+import asyncio
 import logging
 import hashlib
 from datetime import datetime, timedelta, timezone
@@ -70,16 +71,12 @@ class PdfStorage:
             content_hash: SHA-256 del PDF
         """
         import asyncio
-        from concurrent.futures import ThreadPoolExecutor
         
         # 1. Calcular hash (para estadísticas)
-        loop = asyncio.get_event_loop()
-        executor = ThreadPoolExecutor()
-        
         def _calculate_hash():
             return hashlib.sha256(pdf_bytes).hexdigest()
         
-        content_hash = await loop.run_in_executor(executor, _calculate_hash)
+        content_hash = await asyncio.to_thread(_calculate_hash)
         
         # 2. Guardar en GridFS (siempre, con job_id único)
         def _save_sync():
@@ -97,7 +94,7 @@ class PdfStorage:
                 }
             )
         
-        file_id = await loop.run_in_executor(executor, _save_sync)
+        file_id = await asyncio.to_thread(_save_sync)
         
         logger.info(
             f"💾 PDF saved: hash={content_hash[:8]}..., "
@@ -107,6 +104,54 @@ class PdfStorage:
         
         return content_hash
     
+    async def save_from_path(
+        self,
+        pdf_path: str,
+        content_hash: str,
+        size_bytes: int,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Guardar en GridFS un PDF que ya está en disco, sin cargarlo en memoria.
+        
+        GridFS lee el archivo por chunks; hash y tamaño vienen calculados
+        de la copia previa a disco.
+        
+        Args:
+            pdf_path: Ruta del PDF en disco
+            content_hash: SHA-256 del PDF
+            size_bytes: Tamaño del PDF
+            metadata: Metadatos (debe incluir job_id)
+        
+        Returns:
+            content_hash: SHA-256 del PDF
+        """
+        def _save_sync():
+            expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
+            
+            with open(pdf_path, 'rb') as pdf_file:
+                return self.fs.put(
+                    pdf_file,
+                    filename=f"{metadata.get('job_id', content_hash)}.pdf" if metadata else f"{content_hash}.pdf",
+                    metadata={
+                        "content_hash": content_hash,
+                        "size_bytes": size_bytes,
+                        "expires_at": expires_at,
+                        "created_at": datetime.now(timezone.utc),
+                        **(metadata or {})
+                    }
+                )
+        
+        await asyncio.to_thread(_save_sync)
+        
+        logger.info(
+            f"💾 PDF saved: hash={content_hash[:8]}..., "
+            f"size={size_bytes/1024:.2f}KB, "
+            f"job_id={metadata.get('job_id') if metadata else 'N/A'}"
+        )
+        
+        return content_hash
+    
     def get_by_hash(self, content_hash: str) -> bytes:
         """
         Obtener PDF por su content hash.
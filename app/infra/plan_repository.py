@@ -1,18 +1,34 @@
 """
 Repositorio para gestión de planes de suscripción.
 """
+import sys
+import threading
 from typing import Optional, List
 
+from cachetools import TTLCache
+
 from app.domain.entities import Plan
 from app.infra.mongo_client import get_mongo_client
 from app.config import settings
 
 
+# Caché de planes: son pocos y casi inmutables (TTL de 5 min para recoger cambios en BD)
+_PLAN_CACHE_TTL_SECONDS = 300
+_ALL_PLANS_KEY = "__all__"
+_plan_cache: TTLCache = TTLCache(maxsize=32, ttl=_PLAN_CACHE_TTL_SECONDS)
+_plan_cache_lock = threading.Lock()
+
+
 class PlanRepository:
     """Repositorio para operaciones de lectura de planes"""
     
     def get_by_name(self, plan_name: str) -> Optional[Plan]:
-        """Obtener plan por nombre"""
+        """Obtener plan por nombre (cacheado)"""
+        with _plan_cache_lock:
+            plan = _plan_cache.get(plan_name)
+        if plan is not None:
+            return plan
+        
         client = get_mongo_client()
         meta_db = client[settings.mongo_meta_db]
         
@@ -21,21 +37,61 @@ class PlanRepository:
         if not doc:
             return None
         
-        return self._to_entity(doc)
+        plan = self._to_entity(doc)
+        with _plan_cache_lock:
+            _plan_cache[plan_name] = plan
+        return plan
+    
+    def get_cached(self, plan_name: str) -> Optional[Plan]:
+        """Obtener plan solo desde la caché (None si no está: no consulta la BD)"""
+        with _plan_cache_lock:
+            return _plan_cache.get(plan_name)
+    
+    def get_all_cached(self) -> Optional[List[Plan]]:
+        """Obtener todos los planes solo desde la caché (None si no está: no consulta la BD)"""
+        with _plan_cache_lock:
+            plans = _plan_cache.get(_ALL_PLANS_KEY)
+        return list(plans) if plans is not None else None
     
     def get_all(self) -> List[Plan]:
-        """Obtener todos los planes disponibles"""
+        """Obtener todos los planes disponibles (cacheado)"""
+        with _plan_cache_lock:
+            plans = _plan_cache.get(_ALL_PLANS_KEY)
+        if plans is not None:
+            return list(plans)
+        
         client = get_mongo_client()
         meta_db = client[settings.mongo_meta_db]
         
         docs = meta_db.plans.find({}, {"_id": 0})
+        plans = tuple(self._to_entity(doc) for doc in docs)
         
-        return [self._to_entity(doc) for doc in docs]
+        with _plan_cache_lock:
+            _plan_cache[_ALL_PLANS_KEY] = plans
+            for plan in plans:
+                _plan_cache[plan.name] = plan
+        return list(plans)
+    
+    def warm_cache(self) -> int:
+        """
+        Precargar todos los planes en la caché (se llama al arrancar la app).
+        
+        Returns:
+            Cantidad de planes cargados
+        """
+        self.clear_cache()
+        return len(self.get_all())
+    
+    @staticmethod
+    def clear_cache() -> None:
+        """Vaciar la caché de planes (ej. tras editar planes en BD)"""
+        with _plan_cache_lock:
+            _plan_cache.clear()
     
     def _to_entity(self, doc: dict) -> Plan:
         """Convertir documento de MongoDB a entidad Plan"""
         return Plan(
-            name=doc["name"],
+            name=sys.intern(doc["name"]),  # Mismo string que User.plan_name (internado)
             display_name=doc["display_name"],
             price_usd=doc["price_usd"],
             projects_limit=doc["limits"]["projects"],
@@ -47,3 +103,14 @@ class PlanRepository:
             audit_retention_days=doc["limits"]["audit_retention_days"],
             features=doc.get("features", []),
         )
+
+
+# Instancia global singleton
+_plan_repository = None
+
+def get_plan_repository() -> PlanRepository:
+    """Obtener instancia global del repositorio de planes"""
+    global _plan_repository
+    if _plan_repository is None:
+        _plan_repository = PlanRepository()
+    return _plan_repository
@@ -1,13 +1,26 @@
 from datetime import datetime, timezone
 from typing import Protocol, List, Optional
 import hashlib
+import sys
+import threading
+
+from cachetools import TTLCache
 
 from app.config import settings
 from app.domain.entities import Project, Database, ProjectStats
+from app.infra.api_key_repository import get_api_key_repository
 from app.infra.mongo_client import get_mongo_client
 from app.utils.encryption import encrypt_api_key, decrypt_api_key
 
 
+# Caché de resolución de contexto de proyecto por ID (30s). Por API key se usa
+# la caché de ApiKeyRepository (una sola entrada por key: invalidate la limpia).
+# Las stats de estas entidades pueden estar desfasadas: usar get_by_id para mostrarlas.
+_PROJECT_CACHE_TTL_SECONDS = 30
+_project_by_id_cache: TTLCache = TTLCache(maxsize=20_000, ttl=_PROJECT_CACHE_TTL_SECONDS)
+_project_by_id_lock = threading.Lock()
+
+
 class ProjectRepositoryProtocol(Protocol):
     def save(self, project: Project, api_key: str) -> None: ...
     def slug_exists(self, slug: str) -> bool: ...
@@ -35,7 +48,7 @@ def _project_from_doc(doc: dict) -> Project:
         slug=doc.get("slug", ""),
         name=doc["name"],
         description=doc.get("description"),
-        status=doc["status"],
+        status=sys.intern(doc["status"]),  # Vocabulario cerrado (ver UserRepository._to_entity)
         expires_at=doc["expires_at"],
         database=Database(
             name=doc["database"],
@@ -46,6 +59,10 @@ def _project_from_doc(doc: dict) -> Project:
 
 
 class ProjectRepository:
+    def to_entity(self, doc: dict) -> Project:
+        """Convertir un documento ya leído de `projects` (ej. por el middleware) a entidad"""
+        return _project_from_doc(doc)
+    
     def slug_exists(self, slug: str) -> bool:
         """Verificar si un slug ya está en uso"""
         client = get_mongo_client()
@@ -65,6 +82,19 @@ class ProjectRepository:
         
         return _project_from_doc(doc)
     
+    def get_by_id_cached(self, project_id: str) -> Optional[Project]:
+        """Obtener proyecto por ID con caché TTL (resolución de contexto por request)"""
+        with _project_by_id_lock:
+            project = _project_by_id_cache.get(project_id)
+        if project is not None:
+            return project
+        
+        project = self.get_by_id(project_id)
+        if project is not None:
+            with _project_by_id_lock:
+                _project_by_id_cache[project_id] = project
+        return project
+    
     def get_by_user(self, user_id: str) -> List[Project]:
         """Obtener todos los proyectos de un usuario"""
         client = get_mongo_client()
@@ -74,17 +104,14 @@ class ProjectRepository:
         return [_project_from_doc(doc) for doc in docs]
     
     def get_by_api_key(self, api_key: str) -> Optional[Project]:
-        """Obtener proyecto por API key"""
-        client = get_mongo_client()
-        meta_db = client[settings.mongo_meta_db]
-        
-        api_key_hash = _hash_api_key(api_key)
-        doc = meta_db.projects.find_one({"api_key_hash": api_key_hash})
-        
-        if not doc:
-            return None
-        
-        return _project_from_doc(doc)
+        """Obtener proyecto por API key (cacheado en ApiKeyRepository)"""
+        doc = get_api_key_repository().get_project_by_key(api_key)
+        return _project_from_doc(doc) if doc else None
+    
+    async def get_by_api_key_async(self, api_key: str) -> Optional[Project]:
+        """Versión async de get_by_api_key (no bloquea el event loop)"""
+        doc = await get_api_key_repository().get_project_by_key_async(api_key)
+        return _project_from_doc(doc) if doc else None
     
     def save(self, project: Project, api_key: str) -> None:
         client = get_mongo_client()
@@ -115,6 +142,8 @@ class ProjectRepository:
 
         # Crear índice único en slug (sparse permite null en docs antiguos)
         meta_db.projects.create_index("slug", unique=True, sparse=True)
+        # Lookup por API key en cada request autenticado con X-API-Key
+        meta_db.projects.create_index("api_key_hash")
         
         # La base de datos efímera se crea automáticamente
         # Las colecciones se crean dinámicamente cuando se insertan documentos
@@ -186,3 +215,14 @@ class ProjectRepository:
         except Exception:
             # Si falla la desencriptación, retornar None
             return None
+
+
+# Instancia global singleton (comparte el MongoClient del proceso)
+_project_repository = None
+
+def get_project_repository() -> ProjectRepository:
+    """Obtener instancia global del repositorio de proyectos"""
+    global _project_repository
+    if _project_repository is None:
+        _project_repository = ProjectRepository()
+    return _project_repository
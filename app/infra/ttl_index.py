@@ -0,0 +1,49 @@
+"""
+Índice TTL `expires_at` de las colecciones efímeras de cada proyecto.
+
+create_index es idempotente pero cuesta un round-trip a MongoDB; en los
+endpoints de escritura se pagaba en cada request. Aquí se recuerda qué
+colecciones ya tienen el índice para crearlo una sola vez por proceso.
+"""
+import logging
+import threading
+from typing import Set, Tuple
+
+from pymongo import ASCENDING
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# IndexOptionsConflict / IndexKeySpecsConflict: el índice ya existe (con otras opciones)
+_INDEX_EXISTS_CODES = (85, 86)
+
+_ensured: Set[Tuple[str, str]] = set()
+_lock = threading.Lock()
+
+
+def ensure_ttl_index(collection: Collection) -> None:
+    """Crear (una vez por proceso) el índice TTL sobre `expires_at`"""
+    key = (collection.database.name, collection.name)
+    with _lock:
+        if key in _ensured:
+            return
+
+    try:
+        collection.create_index(
+            [("expires_at", ASCENDING)],
+            expireAfterSeconds=0,
+            name="ttl_expires_at",
+        )
+    except OperationFailure as e:
+        if e.code not in _INDEX_EXISTS_CODES:
+            logger.warning(f"⚠️ Could not create TTL index on {key[0]}.{key[1]}: {e}")
+            return
+        # Índice ya existe (con otras opciones): no reintentar
+    except Exception as e:
+        # Error transitorio (red, selección de servidor): se reintenta en la próxima escritura
+        logger.warning(f"⚠️ Could not create TTL index on {key[0]}.{key[1]}: {e}")
+        return
+
+    with _lock:
+        _ensured.add(key)
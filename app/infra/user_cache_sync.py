@@ -0,0 +1,69 @@
+"""
+Invalidación de las cachés de usuarios entre workers.
+
+Cada worker (WEB_CONCURRENCY) tiene sus propias cachés en memoria de usuarios
+por API key y por ID. Un bloqueo o cambio de plan solo las limpia en el worker
+que lo atendió; el resto lo detecta aquí, buscando cada
+`user_cache_sync_seconds` los usuarios con `updated_at` reciente.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.config import settings
+from app.infra.mongo_client import get_async_mongo_client
+from app.infra.user_repository import get_user_repository
+
+logger = logging.getLogger(__name__)
+
+# Margen hacia atrás en cada revisión: cubre relojes desfasados entre réplicas
+# y escrituras en curso (volver a sacar un usuario de la caché es inocuo)
+SYNC_OVERLAP = timedelta(seconds=5)
+
+_sync_task: Optional[asyncio.Task] = None
+
+
+async def _sync_loop() -> None:
+    repo = get_user_repository()
+    since = datetime.now(timezone.utc) - SYNC_OVERLAP
+    while True:
+        await asyncio.sleep(settings.user_cache_sync_seconds)
+        started = datetime.now(timezone.utc)
+        try:
+            evicted = await repo.evict_updated_since_async(since)
+            if evicted:
+                logger.debug(f"User cache sync: {evicted} updated users evicted")
+            since = started - SYNC_OVERLAP
+        except Exception as e:
+            # Se reintenta con el mismo `since`: no se pierden cambios
+            logger.warning(f"⚠️ User cache sync failed: {e}")
+
+
+async def start_user_cache_sync() -> None:
+    """Crear el índice de updated_at y lanzar la revisión periódica (al arrancar)"""
+    global _sync_task
+    if _sync_task is not None:
+        return
+
+    try:
+        meta_db = get_async_mongo_client()[settings.mongo_meta_db]
+        await meta_db.users.create_index("updated_at")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not create users.updated_at index: {e}")
+
+    _sync_task = asyncio.create_task(_sync_loop())
+
+
+async def stop_user_cache_sync() -> None:
+    """Detener la revisión periódica (al apagar)"""
+    global _sync_task
+    if _sync_task is None:
+        return
+
+    _sync_task.cancel()
+    try:
+        await _sync_task
+    except asyncio.CancelledError:
+        pass
+    _sync_task = None
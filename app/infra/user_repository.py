@@ -2,19 +2,43 @@
 Repositorio para gestión de usuarios de SonqoBase.
 """
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Iterable, Optional
 import hashlib
+import sys
+import threading
+
+from cachetools import TTLCache
 
 from app.domain.entities import User, UsageStats
-from app.infra.mongo_client import get_mongo_client
+from app.infra.mongo_client import get_mongo_client, get_async_mongo_client
+from app.infra.api_key_cache import ApiKeyLookupCache
 from app.config import settings
 
 
+# Caché de lookups por API key (60s positivos, 5s negativos)
+_api_key_cache: ApiKeyLookupCache[User] = ApiKeyLookupCache(ttl=60, negative_ttl=5)
+
+# Caché de usuarios por ID (60s) para rutas calientes que solo leen plan/estado
+_user_by_id_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_user_by_id_lock = threading.Lock()
+
+
 def _hash_api_key(api_key: str) -> str:
     """Hashear API key con SHA-256"""
     return hashlib.sha256(api_key.encode()).hexdigest()
 
 
+def _evict_users(user_ids: Iterable[str]) -> None:
+    """Sacar usuarios de las cachés de este proceso (por API key y por ID)"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    _api_key_cache.invalidate(lambda user: user.id in user_ids)
+    with _user_by_id_lock:
+        for user_id in user_ids:
+            _user_by_id_cache.pop(user_id, None)
+
+
 class UserRepository:
     """Repositorio para operaciones CRUD de usuarios"""
     
@@ -47,6 +71,9 @@ class UserRepository:
             },
             "webhook_url": user.webhook_url,
         })
+        
+        # get_by_id y el $lookup de ApiKeyRepository buscan por user_id
+        meta_db.users.create_index("user_id")
     
     def get_by_id(self, user_id: str) -> Optional[User]:
         """Obtener usuario por ID"""
@@ -59,6 +86,47 @@ class UserRepository:
             return None
         
         return self._to_entity(doc)
+    
+    def get_by_id_cached(self, user_id: str) -> Optional[User]:
+        """
+        Obtener usuario por ID con caché TTL de 60s.
+        
+        Los contadores de `usage` pueden estar desfasados hasta 60s: usar
+        `get_by_id` cuando se validen límites de uso.
+        """
+        with _user_by_id_lock:
+            user = _user_by_id_cache.get(user_id)
+        if user is not None:
+            return user
+        
+        user = self.get_by_id(user_id)
+        if user is not None:
+            with _user_by_id_lock:
+                _user_by_id_cache[user_id] = user
+        return user
+
+    def remember(self, doc: dict) -> User:
+        """
+        Cargar en la caché por ID un usuario que llegó en otra consulta
+        (ej. el $lookup de ApiKeyRepository), sin volver a leerlo.
+        """
+        user = self._to_entity(doc)
+        with _user_by_id_lock:
+            _user_by_id_cache[user.id] = user
+        return user
+
+    async def get_by_id_cached_async(self, user_id: str) -> Optional[User]:
+        """Versión async de get_by_id_cached (no bloquea el event loop)"""
+        with _user_by_id_lock:
+            user = _user_by_id_cache.get(user_id)
+        if user is not None:
+            return user
+        
+        client = get_async_mongo_client()
+        meta_db = client[settings.mongo_meta_db]
+        
+        doc = await meta_db.users.find_one({"user_id": user_id}, {"_id": 0})
+        return self.remember(doc) if doc else None
 
     def get_user_by_id(self, user_id: str) -> Optional[dict]:
         """
@@ -72,16 +140,35 @@ class UserRepository:
     
     def get_by_api_key(self, api_key: str) -> Optional[User]:
         """Obtener usuario por API key (comparando hash)"""
+        hit, user = _api_key_cache.lookup(api_key)
+        if hit:
+            return user
+        
         client = get_mongo_client()
         meta_db = client[settings.mongo_meta_db]
         
         api_key_hash = _hash_api_key(api_key)
         doc = meta_db.users.find_one({"api_key_hash": api_key_hash}, {"_id": 0})
         
-        if not doc:
-            return None
+        user = self._to_entity(doc) if doc else None
+        _api_key_cache.store(api_key, user)
+        return user
+    
+    async def get_by_api_key_async(self, api_key: str) -> Optional[User]:
+        """Versión async de get_by_api_key (no bloquea el event loop)"""
+        hit, user = _api_key_cache.lookup(api_key)
+        if hit:
+            return user
         
-        return self._to_entity(doc)
+        client = get_async_mongo_client()
+        meta_db = client[settings.mongo_meta_db]
+        
+        api_key_hash = _hash_api_key(api_key)
+        doc = await meta_db.users.find_one({"api_key_hash": api_key_hash}, {"_id": 0})
+        
+        user = self._to_entity(doc) if doc else None
+        _api_key_cache.store(api_key, user)
+        return user
     
     def get_by_email(self, email: str) -> Optional[User]:
         """Obtener usuario por email"""
@@ -109,6 +196,9 @@ class UserRepository:
                 }
             }
         )
+        # En este worker el bloqueo aplica ya; los demás lo ven por updated_at
+        # en su próxima revisión (evict_updated_since_async)
+        _evict_users((user_id,))
     
     def update_plan(self, user_id: str, plan_name: str) -> None:
         """Actualizar plan del usuario"""
@@ -124,6 +214,24 @@ class UserRepository:
                 }
             }
         )
+        _evict_users((user_id,))
+    
+    async def evict_updated_since_async(self, since: datetime) -> int:
+        """
+        Sacar de las cachés de este proceso a los usuarios modificados desde
+        `since` (update_status/update_plan actualizan updated_at), incluidos
+        los cambios hechos por otros workers.
+        
+        Returns:
+            Número de usuarios modificados encontrados
+        """
+        client = get_async_mongo_client()
+        meta_db = client[settings.mongo_meta_db]
+        
+        cursor = meta_db.users.find({"updated_at": {"$gte": since}}, {"_id": 0, "user_id": 1})
+        user_ids = [doc["user_id"] async for doc in cursor]
+        _evict_users(user_ids)
+        return len(user_ids)
     
     def increment_usage(
         self, 
@@ -178,8 +286,9 @@ class UserRepository:
             id=doc["user_id"],
             email=doc["email"],
             api_key_hash=doc["api_key_hash"],
-            plan_name=doc["plan_name"],
-            status=doc["status"],
+            # Vocabulario cerrado: internados, las comparaciones (== "active") resuelven por identidad
+            plan_name=sys.intern(doc["plan_name"]),
+            status=sys.intern(doc["status"]),
             created_at=created_at,
             updated_at=updated_at,
             usage=UsageStats(
@@ -192,3 +301,14 @@ class UserRepository:
             ),
             webhook_url=doc.get("webhook_url"),
         )
+
+
+# Instancia global singleton (comparte el MongoClient del proceso)
+_user_repository = None
+
+def get_user_repository() -> UserRepository:
+    """Obtener instancia global del repositorio de usuarios"""
+    global _user_repository
+    if _user_repository is None:
+        _user_repository = UserRepository()
+    return _user_repository
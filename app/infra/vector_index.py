@@ -1,11 +1,19 @@
 from pymongo.operations import SearchIndexModel
 
+# Colecciones con índice vectorial ya verificado en este proceso (evita un
+# list_search_indexes por cada lote insertado)
+_ensured = set()
+
 def ensure_vector_index(db, collection_name: str, num_dimensions: int = 768):
+    key = (db.name, collection_name)
+    if key in _ensured:
+        return
     collection = db[collection_name]
     try:
         # Revisar si ya existe
         existing = list(collection.list_search_indexes())
         if existing:
+            _ensured.add(key)
             return
 
         search_index_model = SearchIndexModel(
@@ -23,6 +31,7 @@ def ensure_vector_index(db, collection_name: str, num_dimensions: int = 768):
             type="vectorSearch",
         )
         collection.create_search_index(model=search_index_model)
+        _ensured.add(key)
     except Exception as e:
         import logging
         logging.warning(f"Vector index could not be created: {e}")
@@ -3,13 +3,13 @@ Listener de auditoría para tracking de operaciones.
 Escucha eventos de dominio y registra en audit_logs.
 """
 import logging
+import time
 from collections import deque
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from dataclasses import dataclass, field
 from typing import Literal, Optional
 
 from app.infra.event_bus import get_event_bus
-from app.infra.project_repository import ProjectRepository
+from app.infra.project_repository import get_project_repository
 from app.domain.events import (
     ProjectCreatedEvent,
     DocumentReadEvent,
@@ -36,11 +36,7 @@ class AuditEvent:
     collection: Optional[str] = None
     document_count: int = 1
     metadata: Optional[dict] = None
-    timestamp: datetime = None
-    
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = datetime.now(timezone.utc)
+    timestamp: float = field(default_factory=time.time)  # Epoch (igual que DomainEvent.timestamp)
 
 
 # Cola en memoria para batch processing
@@ -60,7 +56,7 @@ def track_operation(event: AuditEvent):
 async def on_document_read(event: DocumentReadEvent):
     """Registrar lectura de documentos"""
     # Incrementar contador del proyecto
-    project_repo = ProjectRepository()
+    project_repo = get_project_repository()
     project_repo.increment_reads(event.project_id, event.document_count)
     
     # Track en cola (para futuro background worker)
@@ -79,7 +75,7 @@ async def on_document_read(event: DocumentReadEvent):
 async def on_document_written(event: DocumentWrittenEvent):
     """Registrar escritura de documento"""
     # Incrementar contador del proyecto
-    project_repo = ProjectRepository()
+    project_repo = get_project_repository()
     project_repo.increment_writes(event.project_id, 1)
     
     # Track en cola (para futuro background worker)
@@ -99,7 +95,7 @@ async def on_document_written(event: DocumentWrittenEvent):
 async def on_rag_query(event: RagQueryExecutedEvent):
     """Registrar consulta RAG"""
     # Incrementar contador del proyecto
-    project_repo = ProjectRepository()
+    project_repo = get_project_repository()
     project_repo.increment_rag_queries(event.project_id, 1)
     
     # Track en cola (para futuro background worker)
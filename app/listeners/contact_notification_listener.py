@@ -40,7 +40,7 @@ Alguien está interesado en usar SonqoBase:
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 Enviado desde SonqoBase Landing Page
-Fecha: {event.timestamp.strftime('%Y-%m-%d %H:%M:%S UTC')}
+Fecha: {event.as_datetime().strftime('%Y-%m-%d %H:%M:%S UTC')}
 """
         
         await email_service.send_email(
@@ -3,7 +3,6 @@ Listener para envío de notificaciones por email.
 Escucha OtpRequestedEvent y envía el código por correo.
 """
 import logging
-import asyncio
 
 from app.infra.event_bus import get_event_bus
 from app.domain.events import OtpCreatedEvent
@@ -19,7 +18,7 @@ event_bus = get_event_bus()
 async def on_otp_created_email(event: OtpCreatedEvent):
     """
     Listener que envía el OTP por correo.
-    Ejecuta el envío SMTP en un thread separado para no bloquear.
+    El envío SMTP es async (aiosmtplib, sesiones reutilizadas): no bloquea el loop.
     """
     logger.info(f"📧 Processing OTP email for user {event.user_id}")
     
@@ -29,17 +28,12 @@ async def on_otp_created_email(event: OtpCreatedEvent):
         return
     
     email_service = get_email_service()
-    loop = asyncio.get_running_loop()
     
-    # Run blocking SMTP call in thread pool
     try:
-        success = await loop.run_in_executor(
-            None, 
-            lambda: email_service.send_otp_email(
-                to_email=event.email,
-                otp_code=event.otp_code,
-                user_name=event.user_name
-            )
+        success = await email_service.send_otp_email(
+            to_email=event.email,
+            otp_code=event.otp_code,
+            user_name=event.user_name
         )
         
         if success:
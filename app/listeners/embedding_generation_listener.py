@@ -7,9 +7,8 @@ import logging
 from app.infra.event_bus import get_event_bus
 from app.domain.events import PdfChunkedEvent, TextChunkedEvent
 from app.services.embedding_generation import EmbeddingGenerationService
-from app.infra.gemini_embeddings import GeminiEmbeddingProvider
-from app.infra.job_repository import JobRepository
-from app.config import settings
+from app.infra.gemini_embeddings import get_embedding_provider
+from app.infra.job_repository import get_job_repository
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +25,8 @@ async def on_pdf_chunked(event: PdfChunkedEvent):
     """
     # Crear servicio con dependencias
     service = EmbeddingGenerationService(
-        embedding_provider=GeminiEmbeddingProvider(settings.gemini_api_key),
-        job_repo=JobRepository(),
+        embedding_provider=get_embedding_provider(),
+        job_repo=get_job_repository(),
     )
     
     # Delegar toda la lógica al servicio
@@ -50,8 +49,8 @@ async def on_text_chunked(event: TextChunkedEvent):
     """
     # Crear servicio con dependencias
     service = EmbeddingGenerationService(
-        embedding_provider=GeminiEmbeddingProvider(settings.gemini_api_key),
-        job_repo=JobRepository(),
+        embedding_provider=get_embedding_provider(),
+        job_repo=get_job_repository(),
     )
     
     # Delegar toda la lógica al servicio
@@ -6,7 +6,7 @@ import asyncio
 
 from app.infra.event_bus import get_event_bus
 from app.domain.events import OtpCreatedEvent
-from app.infra.otp_repository import OTPRepository
+from app.infra.otp_repository import get_otp_repository
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +20,7 @@ async def on_otp_created_persistence(event: OtpCreatedEvent):
     logger.info(f"💾 ENTERING OtpPersistenceListener for user {event.user_id}")
     
     try:
-        otp_repo = OTPRepository()
-        logger.info("💾 OTPRepository instantiated")
+        otp_repo = get_otp_repository()
         
         # Invalidate old OTPs first
         otp_repo.invalidate_user_otps(event.user_id)
@@ -8,7 +8,7 @@ from app.infra.event_bus import get_event_bus
 from app.domain.events import PdfPageExtractedEvent
 from app.services.pdf_chunking import PdfChunkingService
 from app.infra.pdf_processor import PdfProcessor
-from app.infra.job_repository import JobRepository
+from app.infra.job_repository import get_job_repository
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +29,7 @@ async def on_pdf_page_extracted(event: PdfPageExtractedEvent):
     # Crear servicio con dependencias
     service = PdfChunkingService(
         pdf_processor=PdfProcessor(),
-        job_repo=JobRepository(),
+        job_repo=get_job_repository(),
     )
     
     # Delegar toda la lógica al servicio
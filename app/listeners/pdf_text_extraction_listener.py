@@ -3,14 +3,14 @@ Listener con streaming real usando PyMuPDF.
 Procesa página por página sin cargar PDF completo en memoria.
 """
 import logging
-from pymongo import MongoClient
 
 from app.infra.event_bus import get_event_bus
 from app.domain.events import PdfSavedToGridFSEvent
 from app.services.pdf_text_extraction import PdfTextExtractionService
 from app.infra.pdf_storage import PdfStorage
 from app.infra.pdf_processor import PdfProcessor
-from app.infra.job_repository import JobRepository
+from app.infra.job_repository import get_job_repository
+from app.infra.mongo_client import get_mongo_client
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -28,14 +28,14 @@ async def on_pdf_saved_to_gridfs(event: PdfSavedToGridFSEvent):
     Memoria: Solo 1 página en RAM a la vez.
     """
     # Inicializar dependencias
-    client = MongoClient(settings.mongo_uri)
+    client = get_mongo_client()
     meta_db = client[settings.mongo_meta_db]
     
     # Crear servicio con dependencias
     service = PdfTextExtractionService(
         pdf_storage=PdfStorage(meta_db),
         pdf_processor=PdfProcessor(),
-        job_repo=JobRepository(),
+        job_repo=get_job_repository(),
     )
     
     # Delegar toda la lógica al servicio
@@ -7,7 +7,7 @@ import logging
 from app.infra.event_bus import get_event_bus
 from app.domain.events import TextIngestStartedEvent
 from app.services.text_chunking import TextChunkingService
-from app.infra.job_repository import JobRepository
+from app.infra.job_repository import get_job_repository
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +25,7 @@ async def on_text_ingest_started(event: TextIngestStartedEvent):
     logger.info(f"📝 Text ingest started event received: job_id={event.job_id}")
     
     # Obtener el texto del job
-    job_repo = JobRepository()
+    job_repo = get_job_repository()
     job = job_repo.get(event.job_id)
     
     if not job:
@@ -3,12 +3,12 @@ Listener para almacenamiento de vectores en MongoDB.
 Escucha EmbeddingsGeneratedEvent e inserta en la colección vectorial.
 """
 import logging
-from pymongo import MongoClient
 
 from app.infra.event_bus import get_event_bus
 from app.domain.events import EmbeddingsGeneratedEvent
 from app.services.vector_storage import VectorStorageService
-from app.infra.job_repository import JobRepository
+from app.infra.job_repository import get_job_repository
+from app.infra.mongo_client import get_mongo_client
 from app.infra.pdf_storage import PdfStorage
 from app.config import settings
 
@@ -26,12 +26,12 @@ async def on_embeddings_generated(event: EmbeddingsGeneratedEvent):
     Pipeline: EmbeddingsGeneratedEvent → Insertar en MongoDB → PdfIngestCompletedEvent
     """
     # Inicializar dependencias
-    client = MongoClient(settings.mongo_uri)
+    client = get_mongo_client()
     meta_db = client[settings.mongo_meta_db]
     
     # Crear servicio con dependencias
     service = VectorStorageService(
-        job_repo=JobRepository(),
+        job_repo=get_job_repository(),
         pdf_storage=PdfStorage(meta_db),
     )
     
@@ -1,10 +1,14 @@
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
+import anyio.to_thread
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -16,19 +20,29 @@ from app.api.v1.users import router as users_router
 from app.api.v1.auth import router as auth_router
 from app.api.v1.plans import router as plans_router
 from app.api.v1.jobs import router as jobs_router
-from app.api.web import router as web_router
+from app.api.web import router as web_router, warm_templates
 from app.middleware.auth import AuthMiddleware
 from app.middleware.error_handler import (
     global_exception_handler,
     http_exception_handler,
     validation_exception_handler
 )
-from app.infra.event_bus import get_event_bus
+from app.config import settings
+from app.infra.event_bus import close_event_bus, get_event_bus
+from app.infra.mongo_client import get_async_mongo_client, get_mongo_client
+from app.infra.pdf_processor import shutdown_pdf_process_pool, start_pdf_process_pool
+from app.infra.plan_repository import get_plan_repository
+from app.infra.user_cache_sync import start_user_cache_sync, stop_user_cache_sync
+from app.infra.email_service import close_email_service
+from app.infra.gemini_embeddings import close_embedding_provider
+from app.utils.log_config import configure_logging
 
 # Importar listeners para auto-registro
 import app.listeners
 import app.listeners.otp_persistence_listener  # NEW
 
+# Logging se configura una sola vez, al arrancar la app
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Configure rate limiter
@@ -40,6 +54,7 @@ app = FastAPI(
     description="API para gestionar bases de datos vectoriales efímeras con RAG.",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,  # Serialización JSON en Rust (orjson)
     contact={
         "name": "SonqoBase Support",
         "email": "support@sonqobase.com",
@@ -185,12 +200,57 @@ app.include_router(
 
 @app.on_event("startup")
 async def startup_event():
-    """Inicializar event bus y mostrar listeners registrados"""
+    """Inicializar recursos compartidos y precargar cachés"""
+    # Los endpoints async delegan pymongo a hilos (asyncio.to_thread) y los `def`
+    # corren en el limiter de anyio: ambos pools se dimensionan igual
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.threadpool_max_workers)
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_max_workers
+    
+    # Pool de procesos para PDFs grandes: se crea ahora y no en el primer PDF
+    start_pdf_process_pool(settings.pdf_process_workers)
+    
     event_bus = get_event_bus()
     listener_count = event_bus.get_listener_count()
+    
+    # Conectar ambos clientes ahora (selección de servidor + handshake/auth)
+    # y no en el primer request
+    try:
+        await asyncio.to_thread(get_mongo_client().admin.command, "ping")
+        await get_async_mongo_client().admin.command("ping")
+        logger.info("🍃 MongoDB connections warmed")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not warm MongoDB connections: {e}")
+    
+    # Bloqueos y cambios de plan hechos en otros workers invalidan la caché local
+    await start_user_cache_sync()
+    
+    # Los planes casi no cambian: precargarlos evita consultas en cada ingesta
+    try:
+        plans_count = await asyncio.to_thread(get_plan_repository().warm_cache)
+        logger.info(f"📦 Plan cache warmed with {plans_count} plans")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not warm plan cache: {e}")
+    
+    # Compilar templates ahora y no en el primer request de cada página
+    templates_count = warm_templates()
+    logger.info(f"🧩 {templates_count} templates compiled")
+    
     logger.info(f"🚀 SonqoBase started with {listener_count} event listeners registered")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Liberar recursos compartidos al apagar"""
+    await stop_user_cache_sync()
+    # Primero los eventos pendientes: sus listeners aún usan embeddings, SMTP y el pool de PDFs
+    await close_event_bus()
+    await close_embedding_provider()
+    await close_email_service()
+    await asyncio.to_thread(shutdown_pdf_process_pool)
+
+
 @app.get("/api/v1/health")
 def health() -> dict:
     return {"status": "ok", "service": "SonqoBase"}
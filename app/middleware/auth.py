@@ -5,15 +5,17 @@ Soporta 3 niveles de autenticación:
 2. User API Key (developers) - Header: X-User-Key  
 3. Project API Key (end-users) - Header: X-API-Key
 """
-from datetime import datetime, timezone
+import asyncio
+import time
 from fastapi import Request, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from typing import Optional
 import logging
 
-from app.infra.master_key_repository import MasterKeyRepository
-from app.infra.user_repository import UserRepository
-from app.infra.api_key_repository import ApiKeyRepository
+from app.infra.master_key_repository import MasterKeyRepository, get_master_key_repository
+from app.infra.user_repository import UserRepository, get_user_repository
+from app.infra.api_key_repository import ApiKeyRepository, get_api_key_repository
 from app.domain.entities import User
 
 from app.utils.jwt import decode_token
@@ -73,22 +75,30 @@ class AuthMiddleware(BaseHTTPMiddleware):
                     logger.debug(f"Path {request.url.path} matches public path: {path}")
                     return await call_next(request)
         
-        # Crear repositorios por request (usan singleton de conexión)
-        master_key_repo = MasterKeyRepository()
-        user_repo = UserRepository()
-        project_key_repo = ApiKeyRepository()
+        # Repositorios compartidos por proceso (sin estado, usan singleton de conexión)
+        master_key_repo = get_master_key_repository()
+        user_repo = get_user_repository()
+        project_key_repo = get_api_key_repository()
         
         # Intentar autenticación en orden de prioridad
         # 1. JWT (Bearer Token)
         # 2. Master Key
         # 3. User Key (Legacy/Initial Auth)
         # 4. Project Key (API Access)
-        auth_result = (
-            self._try_jwt_auth(request, user_repo) or
-            self._try_master_key_auth(request, master_key_repo) or
-            self._try_user_key_auth(request, user_repo) or
-            self._try_project_key_auth(request, project_key_repo, user_repo)
-        )
+        # Los lookups 1-3 son pymongo síncrono: se ejecutan fuera del event loop
+        # (y solo si viene alguno de sus headers)
+        headers = request.headers
+        # Proyecto elegido en el dashboard (JWT): get_project_context lo lee de aquí
+        request.state.project_id_header = headers.get("x-project-id")
+        auth_result = False
+        if "authorization" in headers or "x-master-key" in headers or "x-user-key" in headers:
+            auth_result = await asyncio.to_thread(
+                self._authenticate, request, master_key_repo, user_repo
+            )
+        
+        # El Project Key (la ruta más frecuente, SDKs) usa el driver async
+        if not auth_result and not hasattr(request.state, 'auth_error'):
+            auth_result = await self._try_project_key_auth(request, project_key_repo, user_repo)
         
         # Si hubo un error específico durante la autenticación, retornarlo
         if hasattr(request.state, 'auth_error'):
@@ -119,36 +129,45 @@ class AuthMiddleware(BaseHTTPMiddleware):
     
     def _unauthorized_response(self, detail: str):
         """Retornar respuesta de error 401"""
-        from starlette.responses import JSONResponse
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
             content={"detail": detail}
         )
     
     def _forbidden_response(self, detail: str):
         """Retornar respuesta de error 403"""
-        from starlette.responses import JSONResponse
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
             content={"detail": detail}
         )
     
     def _not_found_response(self, detail: str):
         """Retornar respuesta de error 404"""
-        from starlette.responses import JSONResponse
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={"detail": detail}
         )
     
     def _gone_response(self, detail: str):
         """Retornar respuesta de error 410"""
-        from starlette.responses import JSONResponse
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_410_GONE,
             content={"detail": detail}
         )
     
+    def _authenticate(
+        self,
+        request: Request,
+        master_key_repo: MasterKeyRepository,
+        user_repo: UserRepository,
+    ) -> bool:
+        """Cadena de autenticación síncrona (JWT, Master Key, User Key; corre en el threadpool)"""
+        return (
+            self._try_jwt_auth(request, user_repo) or
+            self._try_master_key_auth(request, master_key_repo) or
+            self._try_user_key_auth(request, user_repo)
+        )
+    
     def _try_jwt_auth(self, request: Request, user_repo: UserRepository) -> bool:
         """Intentar autenticación con JWT Bearer Token"""
         auth_header = request.headers.get("Authorization")
@@ -223,6 +242,8 @@ class AuthMiddleware(BaseHTTPMiddleware):
             return False
         
         # logger.info(f"Looking for user with key: {user_key[:20]}...")
+        # Cacheado 60s por worker (ver user_cache_sync): request.state.user puede
+        # traer contadores de uso de hasta 60s atrás; leerlos frescos si importan
         user = user_repo.get_by_api_key(user_key)
         
         # logger.info(f"User found: {bool(user)}")
@@ -245,7 +266,7 @@ class AuthMiddleware(BaseHTTPMiddleware):
         logger.warning("User not found with provided API key")
         return False
     
-    def _try_project_key_auth(
+    async def _try_project_key_auth(
         self,
         request: Request,
         project_key_repo: ApiKeyRepository,
@@ -257,20 +278,17 @@ class AuthMiddleware(BaseHTTPMiddleware):
         if not project_key:
             return False
         
-        project = project_key_repo.get_project_by_key(project_key)
+        project = await project_key_repo.get_project_by_key_async(project_key)
         
         if project:
-            # Verificar que el proyecto no haya expirado
-            expires_at = project["expires_at"]
-            if expires_at.tzinfo is None:
-                expires_at = expires_at.replace(tzinfo=timezone.utc)
-            
-            if expires_at < datetime.now(timezone.utc):
+            # Verificar que el proyecto no haya expirado (expires_ts lo precalcula ApiKeyRepository)
+            if project["expires_ts"] < time.time():
                 request.state.auth_error = self._gone_response("Project has expired")
                 return False
             
-            # Obtener usuario del proyecto
-            user = user_repo.get_by_id(project["user_id"])
+            # Obtener usuario del proyecto (ApiKeyRepository ya lo dejó en caché;
+            # mismo atraso posible de contadores de uso que con X-User-Key)
+            user = await user_repo.get_by_id_cached_async(project["user_id"])
             
             if not user:
                 request.state.auth_error = self._not_found_response("Project owner not found")
@@ -290,35 +308,3 @@ class AuthMiddleware(BaseHTTPMiddleware):
             return True
         
         return False
-    
-    def _unauthorized_response(self, detail: str):
-        """Retornar respuesta de error 401"""
-        from starlette.responses import JSONResponse
-        return JSONResponse(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            content={"detail": detail}
-        )
-    
-    def _forbidden_response(self, detail: str):
-        """Retornar respuesta de error 403"""
-        from starlette.responses import JSONResponse
-        return JSONResponse(
-            status_code=status.HTTP_403_FORBIDDEN,
-            content={"detail": detail}
-        )
-    
-    def _not_found_response(self, detail: str):
-        """Retornar respuesta de error 404"""
-        from starlette.responses import JSONResponse
-        return JSONResponse(
-            status_code=status.HTTP_404_NOT_FOUND,
-            content={"detail": detail}
-        )
-    
-    def _gone_response(self, detail: str):
-        """Retornar respuesta de error 410"""
-        from starlette.responses import JSONResponse
-        return JSONResponse(
-            status_code=status.HTTP_410_GONE,
-            content={"detail": detail}
-        )
@@ -1,11 +1,11 @@
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from datetime import datetime
 import logging
 import uuid
-from typing import Union, List, Any
+from typing import Dict, Optional, Union, List, Any
 
 # Configurar logger
 logger = logging.getLogger("sonqobase.errors")
@@ -15,17 +15,19 @@ def create_error_response(
     message: str,
     code: str = "ERROR",
     details: Union[List[str], Any] = None,
-    path: str = ""
-) -> JSONResponse:
-    return JSONResponse(
+    path: str = "",
+    headers: Optional[Dict[str, str]] = None,
+) -> ORJSONResponse:
+    return ORJSONResponse(
         status_code=status_code,
+        headers=headers,
         content={
             "success": False,
             "error": {
                 "code": code,
                 "message": message,
                 "details": details,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": datetime.utcnow(),  # orjson lo serializa a ISO 8601
                 "path": path,
                 "request_id": str(uuid.uuid4()) # En producción, usar ID real del request
             }
@@ -48,7 +50,8 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         status_code=exc.status_code,
         message=exc.detail,
         code=f"HTTP_{exc.status_code}",
-        path=request.url.path
+        path=request.url.path,
+        headers=getattr(exc, "headers", None),  # ej. Retry-After, WWW-Authenticate
     )
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
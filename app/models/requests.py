@@ -1,7 +1,12 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Dict, Any
 
 
+# Config común de los bodies de auth/admin: inmutables una vez parseados y con
+# el whitespace recortado (keys y códigos pegados desde el correo o la consola)
+REQUEST_MODEL_CONFIG = ConfigDict(extra="ignore", frozen=True, str_strip_whitespace=True)
+
+
 class ProjectCreateRequest(BaseModel):
     name: str
     slug: str  # Identificador legible (ej: "altoqperu")
@@ -1,10 +1,17 @@
 """
 Servicio para generación de embeddings.
 """
+import asyncio
 import logging
+import random
+from array import array
 from typing import List, Dict, Any
 
-from app.infra.gemini_embeddings import GeminiEmbeddingProvider
+from app.infra.gemini_embeddings import (
+    MAX_BATCH_SIZE,
+    MAX_CONCURRENT_REQUESTS,
+    GeminiEmbeddingProvider,
+)
 from app.infra.job_repository import JobRepository
 from app.infra.event_bus import get_event_bus
 from app.domain.events import EmbeddingsGeneratedEvent, PdfIngestFailedEvent
@@ -53,16 +60,25 @@ class EmbeddingGenerationService:
             # 1. Actualizar estado del job
             self.job_repo.update_status(job_id, "generating_embeddings", progress=60)
             
-            # 2. Generar embeddings en lotes (batch de 10 para optimizar)
-            batch_size = 10
-            all_embeddings = []
+            # 2. Generar embeddings en lotes (un request a Gemini por lote),
+            #    varios lotes en vuelo a la vez; cada lote escribe en su rango
+            batch_size = MAX_BATCH_SIZE
+            # Cada vector se guarda como array('f'): 4 bytes por componente en
+            # lugar de un objeto float de Python (~8x menos memoria por job)
+            all_embeddings: List[array] = [None] * len(chunks)
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+            embedded_count = 0
             
-            for i in range(0, len(chunks), batch_size):
+            async def embed_range(i: int) -> None:
+                nonlocal embedded_count
                 batch = chunks[i:i + batch_size]
                 
-                # Generar embeddings para el batch
-                batch_embeddings = await self.embedding_provider.embed_batch(batch)
-                all_embeddings.extend(batch_embeddings)
+                async with semaphore:
+                    # Jitter para no disparar todos los lotes a la vez (evita ráfagas de 429)
+                    await asyncio.sleep(random.random() * 0.02)
+                    batch_embeddings = await self.embedding_provider.embed_batch(batch)
+                all_embeddings[i:i + len(batch)] = [array("f", values) for values in batch_embeddings]
+                embedded_count += len(batch)
                 
                 # Track embedding costs
                 try:
@@ -89,8 +105,8 @@ class EmbeddingGenerationService:
                     # Don't fail embedding generation if cost tracking fails
                     logger.warning(f"Failed to log embedding cost: {e}")
                 
-                # Actualizar progreso
-                progress = 60 + int((i / len(chunks)) * 30)  # 60% a 90%
+                # Actualizar progreso (según lotes completados, no según su posición)
+                progress = 60 + int((embedded_count / len(chunks)) * 30)  # 60% a 90%
                 self.job_repo.update_status(
                     job_id,
                     "generating_embeddings",
@@ -98,11 +114,15 @@ class EmbeddingGenerationService:
                     result={
                         "pages_processed": chunk_metadata[0].get('pdf_pages', 0) if chunk_metadata else 0,
                         "chunks_created": len(chunks),
-                        "embeddings_generated": len(all_embeddings)
+                        "embeddings_generated": embedded_count
                     }
                 )
                 
-                logger.info(f"📊 Embeddings progress: {len(all_embeddings)}/{len(chunks)} ({progress}%)")
+                logger.info(f"📊 Embeddings progress: {embedded_count}/{len(chunks)} ({progress}%)")
+            
+            await asyncio.gather(*[
+                embed_range(i) for i in range(0, len(chunks), batch_size)
+            ])
             
             logger.info(f"✅ Embeddings generated: job_id={job_id}, count={len(all_embeddings)}")
             
@@ -29,7 +29,17 @@ class GetJobStatusService:
         """
         # Obtener job
         job = self.job_repo.get(job_id)
-        
+        return self._to_response(job_id, job, user_id)
+    
+    async def execute_async(self, job_id: str, user_id: str) -> Dict[str, Any]:
+        """Versión async de execute (lectura con el cliente Mongo async)"""
+        job = await self.job_repo.get_async(job_id)
+        return self._to_response(job_id, job, user_id)
+    
+    def _to_response(
+        self, job_id: str, job: Optional[Dict[str, Any]], user_id: str
+    ) -> Dict[str, Any]:
+        """Validar acceso y formatear la información del job"""
         if not job:
             raise ValueError(f"Job {job_id} not found")
         
@@ -1,10 +1,9 @@
 from datetime import datetime, timezone
 from typing import Dict, Any
 
-from pymongo import ASCENDING
-
 from app.infra.api_key_repository import ApiKeyRepository
 from app.infra.mongo_client import get_mongo_client
+from app.infra.ttl_index import ensure_ttl_index
 
 
 class InsertCollectionService:
@@ -28,15 +27,7 @@ class InsertCollectionService:
         col = db[collection]
         
         # Crear índice TTL si no existe (idempotente)
-        try:
-            col.create_index(
-                [("expires_at", ASCENDING)],
-                expireAfterSeconds=0,
-                name="ttl_expires_at",
-            )
-        except Exception:
-            # Índice ya existe, continuar
-            pass
+        ensure_ttl_index(col)
         
         result = col.insert_one(document)
 
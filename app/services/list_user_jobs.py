@@ -34,20 +34,25 @@ class ListUserJobsService:
         
         # Obtener jobs del usuario
         jobs = self.job_repo.get_user_jobs(user_id, limit=limit, status=status_filter)
+        return self._to_response(jobs)
+    
+    async def execute_async(
+        self,
+        user_id: str,
+        limit: int = 10,
+        status_filter: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Versión async de execute (lectura con el cliente Mongo async)"""
+        limit = min(limit, 50)
+        jobs = await self.job_repo.get_user_jobs_async(user_id, limit=limit, status=status_filter)
+        return self._to_response(jobs)
+    
+    def _to_response(self, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Formatear respuesta.
         
-        # Formatear respuesta
-        return {
-            "jobs": [
-                {
-                    "job_id": job['job_id'],
-                    "type": job['type'],
-                    "status": job['status'],
-                    "progress": job['progress'],
-                    "collection": job['collection'],
-                    "created_at": job['created_at'].isoformat(),
-                    "completed_at": job['completed_at'].isoformat() if job['completed_at'] else None,
-                }
-                for job in jobs
-            ],
-            "count": len(jobs)
-        }
+        El repositorio ya proyecta solo los campos del listado (JOB_LIST_PROJECTION),
+        así que los documentos se devuelven tal cual. Las fechas quedan como
+        datetime: orjson las serializa a ISO 8601 en C.
+        """
+        return {"jobs": jobs, "count": len(jobs)}
@@ -4,7 +4,6 @@ Servicio para chunking de texto de PDFs.
 import logging
 import asyncio
 from typing import List, Dict, Any
-from concurrent.futures import ThreadPoolExecutor
 
 from app.infra.pdf_processor import PdfProcessor
 from app.infra.job_repository import JobRepository
@@ -71,12 +70,8 @@ class PdfChunkingService:
             job = self.job_repo.get(job_id)
             chunk_size = job.get('metadata', {}).get('chunk_size', 500)
             
-            # Chunk SOLO esta página (thread pool)
-            loop = asyncio.get_event_loop()
-            executor = ThreadPoolExecutor()
-            
-            chunks = await loop.run_in_executor(
-                executor,
+            # Chunk SOLO esta página (threadpool por defecto del loop)
+            chunks = await asyncio.to_thread(
                 self.pdf_processor.chunk_text,
                 page_text,
                 chunk_size
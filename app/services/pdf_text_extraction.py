@@ -4,10 +4,11 @@ Servicio para extracción de texto de PDFs.
 import logging
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
 from typing import Optional
 
 from app.infra.pdf_storage import PdfStorage
-from app.infra.pdf_processor import PdfProcessor
+from app.infra.pdf_processor import PdfProcessor, count_pages
 from app.infra.job_repository import JobRepository
 from app.infra.pdf_concurrency_limiter import get_concurrency_limiter
 from app.infra.event_bus import get_event_bus
@@ -15,6 +16,9 @@ from app.domain.events import PdfPageExtractedEvent, PdfIngestFailedEvent
 
 logger = logging.getLogger(__name__)
 
+# Desde cuántas páginas conviene repartir la extracción entre procesos
+PARALLEL_MIN_PAGES = 5
+
 
 class PdfTextExtractionService:
     """Servicio para extraer texto de PDFs con streaming"""
@@ -79,86 +83,25 @@ class PdfTextExtractionService:
             # Actualizar progreso inicial
             self.job_repo.update_status(job_id, "extracting_text", progress=10)
             
-            # Streaming real con PyMuPDF
-            loop = asyncio.get_event_loop()
-            executor = ThreadPoolExecutor(max_workers=1)
-            
-            # Crear generador (PyMuPDF procesa página por página)
-            page_generator = self.pdf_processor.extract_pages_streaming(pdf_file)
-            
-            page_number = 0
-            total_pages = None
-            
-            logger.info(f"📄 Starting page-by-page streaming...")
+            # PDFs grandes: texto extraído en paralelo por procesos (CPU-bound).
+            # PDFs chicos: streaming página a página (no compensa el IPC)
+            pdf_bytes = await asyncio.to_thread(pdf_file.read)
+            total_pages = await asyncio.to_thread(count_pages, pdf_bytes)
             
-            # Procesar cada página
-            while True:
-                # Wrapper para manejar StopIteration correctamente
-                def get_next_page():
-                    try:
-                        return next(page_generator)
-                    except StopIteration:
-                        return None  # Sentinel value
-                
-                # Extraer siguiente página en thread pool
-                page_data = await loop.run_in_executor(executor, get_next_page)
-                
-                # Si es None, terminamos
-                if page_data is None:
-                    break
-                
-                page_number = page_data["page_number"]
-                total_pages = page_data["total_pages"]
-                text_length = len(page_data["text"])
-                
-                # En la primera página, inicializar total_pages en el resultado del job
-                # Esto es CRÍTICO para que vector_storage sepa cuántas páginas esperar
-                if page_number == 1:
-                    self.job_repo.update_status(
-                        job_id,
-                        "extracting_text",
-                        progress=10,
-                        result={
-                            "total_pages": total_pages,
-                            "pages_stored": 0,  # Inicializar contador
-                            "total_chunks_stored": 0,
-                            "total_vectors_stored": 0
-                        }
-                    )
-                    logger.info(f"📊 Job initialized with total_pages={total_pages}")
+            if total_pages >= PARALLEL_MIN_PAGES:
+                logger.info(f"📄 Starting parallel extraction of {total_pages} pages...")
+                # Cada página se publica en orden apenas su rango está extraído
+                pages = self.pdf_processor.extract_pages_parallel(pdf_bytes, total_pages)
+                del pdf_bytes
                 
-                logger.info(f"📄 Page {page_number}/{total_pages}: {text_length} chars extracted")
-
-                
-                # Publicar evento de página
-                await self.event_bus.publish(
-                    PdfPageExtractedEvent(
-                        job_id=job_id,
-                        user_id=user_id,
-                        project_id=project_id,
-                        collection=collection,
-                        page_number=page_number,
-                        total_pages=total_pages,
-                        page_text=page_data["text"],
-                        page_metadata=page_data["metadata"],
-                    )
-                )
-                
-                # Incrementar progreso (10% a 40% = 30% total / total_pages)
-                progress_per_page = int(30 / total_pages) if total_pages > 0 else 1
-                self.job_repo.increment_progress(
-                    job_id,
-                    delta=progress_per_page,
-                    status="extracting_text",
-                    result={
-                        "pages_processed": page_number,
-                        "total_pages": total_pages
-                    }
-                )
-                
-                logger.info(f"✅ Page {page_number}/{total_pages} streamed")
+                async with aclosing(pages):
+                    async for page_data in pages:
+                        await self._publish_page(job_id, user_id, project_id, collection, page_data)
+            else:
+                logger.info(f"📄 Starting page-by-page streaming...")
+                await self._stream_pages(job_id, user_id, project_id, collection, pdf_bytes)
             
-            logger.info(f"🎉 All {total_pages} pages processed with streaming")
+            logger.info(f"🎉 All {total_pages} pages processed")
             
         except Exception as e:
             logger.error(f"❌ Streaming failed: {job_id}, error={e}", exc_info=True)
@@ -177,3 +120,94 @@ class PdfTextExtractionService:
         
         finally:
             self.concurrency_limiter.release(plan_name, job_id)
+    
+    async def _stream_pages(
+        self,
+        job_id: str,
+        user_id: str,
+        project_id: str,
+        collection: str,
+        pdf_bytes: bytes,
+    ) -> None:
+        """Extraer y publicar página por página desde un hilo dedicado"""
+        loop = asyncio.get_running_loop()
+        
+        # Crear generador (pypdf procesa página por página)
+        page_generator = self.pdf_processor.extract_pages_streaming(pdf_bytes)
+        
+        # Wrapper para manejar StopIteration correctamente
+        def get_next_page():
+            try:
+                return next(page_generator)
+            except StopIteration:
+                return None  # Sentinel value
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            while True:
+                # Extraer siguiente página en thread pool
+                page_data = await loop.run_in_executor(executor, get_next_page)
+                
+                # Si es None, terminamos
+                if page_data is None:
+                    break
+                
+                await self._publish_page(job_id, user_id, project_id, collection, page_data)
+    
+    async def _publish_page(
+        self,
+        job_id: str,
+        user_id: str,
+        project_id: str,
+        collection: str,
+        page_data: dict,
+    ) -> None:
+        """Publicar el evento de una página extraída y actualizar el progreso del job"""
+        page_number = page_data["page_number"]
+        total_pages = page_data["total_pages"]
+        text_length = len(page_data["text"])
+        
+        # En la primera página, inicializar total_pages en el resultado del job
+        # Esto es CRÍTICO para que vector_storage sepa cuántas páginas esperar
+        if page_number == 1:
+            self.job_repo.update_status(
+                job_id,
+                "extracting_text",
+                progress=10,
+                result={
+                    "total_pages": total_pages,
+                    "pages_stored": 0,  # Inicializar contador
+                    "total_chunks_stored": 0,
+                    "total_vectors_stored": 0
+                }
+            )
+            logger.info(f"📊 Job initialized with total_pages={total_pages}")
+        
+        logger.info(f"📄 Page {page_number}/{total_pages}: {text_length} chars extracted")
+        
+        # Publicar evento de página
+        await self.event_bus.publish(
+            PdfPageExtractedEvent(
+                job_id=job_id,
+                user_id=user_id,
+                project_id=project_id,
+                collection=collection,
+                page_number=page_number,
+                total_pages=total_pages,
+                page_text=page_data["text"],
+                page_metadata=page_data["metadata"],
+            )
+        )
+        
+        # Incrementar progreso (10% a 40% = 30% total / total_pages)
+        progress_per_page = int(30 / total_pages) if total_pages > 0 else 1
+        self.job_repo.increment_progress(
+            job_id,
+            delta=progress_per_page,
+            status="extracting_text",
+            result={
+                "pages_processed": page_number,
+                "total_pages": total_pages
+            }
+        )
+        
+        logger.info(f"✅ Page {page_number}/{total_pages} streamed")
@@ -1,12 +1,10 @@
 from datetime import datetime, timezone
 from typing import List
 from uuid import uuid4
-import asyncio
-
-from pymongo import ASCENDING
 
 from app.domain.embeddings import EmbeddingProvider
 from app.infra.mongo_client import get_mongo_client
+from app.infra.ttl_index import ensure_ttl_index
 from app.infra.api_key_repository import ApiKeyRepository
 from app.infra.vector_index import ensure_vector_index
 
@@ -47,10 +45,8 @@ class RagIngestService:
 
         doc_id = document_id or f"doc_{uuid4().hex[:8]}"
         
-        # Generar todos los embeddings en paralelo (optimización de performance)
-        embeddings = await asyncio.gather(*[
-            self.embedding_provider.embed(chunk) for chunk in chunks
-        ])
+        # Un request de embeddings por lote (no uno por chunk); mismo orden que `chunks`
+        embeddings = await self.embedding_provider.embed_batch(chunks)
         
         # Preparar documentos para inserción masiva
         documents = [
@@ -60,28 +56,20 @@ class RagIngestService:
                 "document_id": doc_id,
                 "metadata": {
                     "chunk": idx,
-                    **meta,
+                    **(metadata or {}),
                 },
                 "created_at": datetime.now(timezone.utc),
                 "expires_at": project.expires_at,
             }
-            for idx, (chunk, embedding, meta) in enumerate(zip(chunks, embeddings, metadata))
+            for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings))
         ]
         
         # Inserción masiva (mucho más eficiente)
         if documents:
-            vector_collection.insert_many(documents)
+            vector_collection.insert_many(documents, ordered=False)
         
         # Crear índice TTL para auto-limpieza
-        try:
-            vector_collection.create_index(
-                [("expires_at", ASCENDING)],
-                expireAfterSeconds=0,
-                name="ttl_expires_at",
-            )
-        except Exception:
-            # Índice ya existe
-            pass
+        ensure_ttl_index(vector_collection)
         
         # Crear índice vectorial para búsqueda
         ensure_vector_index(db, vector_collection_name)
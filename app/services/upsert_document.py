@@ -1,12 +1,12 @@
 from datetime import datetime, timezone
 from typing import Dict, Any
 
-from pymongo import ASCENDING
 from bson import ObjectId
 from bson.errors import InvalidId
 
 from app.infra.api_key_repository import ApiKeyRepository
 from app.infra.mongo_client import get_mongo_client
+from app.infra.ttl_index import ensure_ttl_index
 
 
 class UpsertDocumentService:
@@ -35,14 +35,7 @@ class UpsertDocumentService:
         col = db[collection]
 
         # Crear índice TTL si no existe
-        try:
-            col.create_index(
-                [("expires_at", ASCENDING)],
-                expireAfterSeconds=0,
-                name="ttl_expires_at",
-            )
-        except Exception:
-            pass
+        ensure_ttl_index(col)
 
         # Preparar documento
         document = {
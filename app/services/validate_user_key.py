@@ -55,5 +55,5 @@ class ValidateUserKeyService:
                 "writes": user.usage.writes_count,
                 "rag_queries": user.usage.rag_queries_count,
             },
-            "created_at": user.created_at.isoformat(),
+            "created_at": user.created_at_iso,
         }
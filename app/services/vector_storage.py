@@ -2,12 +2,14 @@
 Servicio para almacenamiento de vectores en MongoDB.
 """
 import logging
+from array import array
 from datetime import datetime, timezone
 from typing import List, Dict, Any
-from pymongo import MongoClient, ASCENDING
 
 from app.infra.job_repository import JobRepository
+from app.infra.mongo_client import get_mongo_client
 from app.infra.pdf_storage import PdfStorage
+from app.infra.ttl_index import ensure_ttl_index
 from app.infra.vector_index import ensure_vector_index
 from app.infra.event_bus import get_event_bus
 from app.domain.events import PdfIngestCompletedEvent, PdfIngestFailedEvent
@@ -27,7 +29,7 @@ class VectorStorageService:
         self.job_repo = job_repo
         self.pdf_storage = pdf_storage
         self.event_bus = get_event_bus()
-        self.client = MongoClient(settings.mongo_uri)
+        self.client = get_mongo_client()
         self.meta_db = self.client[settings.mongo_meta_db]
     
     async def execute(
@@ -37,7 +39,7 @@ class VectorStorageService:
         project_id: str,
         collection: str,
         chunks: List[str],
-        embeddings: List[List[float]],
+        embeddings: List[array],
         metadata: List[Dict[str, Any]],
     ) -> None:
         """
@@ -49,7 +51,7 @@ class VectorStorageService:
             project_id: ID del proyecto
             collection: Nombre de la colección
             chunks: Lista de chunks de texto
-            embeddings: Lista de vectores de embeddings
+            embeddings: Vectores de embeddings (array('f') por chunk)
             metadata: Metadata de cada chunk
         
         Raises:
@@ -91,7 +93,7 @@ class VectorStorageService:
             documents = [
                 {
                     "text": chunk,
-                    "embedding": embedding,
+                    "embedding": embedding.tolist(),  # BSON array de doubles (Vector Search)
                     "document_id": document_id,  # Usar document_id del usuario
                     "metadata": {
                         **meta,
@@ -112,21 +114,13 @@ class VectorStorageService:
                 )
             
             # 7. Insertar en batch
-            result = vector_collection.insert_many(documents)
+            result = vector_collection.insert_many(documents, ordered=False)
             inserted_count = len(result.inserted_ids)
             
             logger.info(f"✅ Vectors stored: job_id={job_id}, inserted={inserted_count}")
             
             # 8. Crear índice TTL para auto-limpieza
-            try:
-                vector_collection.create_index(
-                    [("expires_at", ASCENDING)],
-                    expireAfterSeconds=0,
-                    name="ttl_expires_at",
-                )
-            except Exception:
-                # Índice ya existe
-                pass
+            ensure_ttl_index(vector_collection)
             
             # 9. Crear índice vectorial si no existe (para MongoDB Atlas Vector Search)
             ensure_vector_index(ephemeral_db, vector_collection_name, num_dimensions=768)
@@ -4,20 +4,94 @@ Guarda PDF en GridFS ANTES de publicar evento para liberar memoria inmediatament
 """
 import logging
 import asyncio
-from typing import Any, Dict, Optional
+import hashlib
+import os
+import tempfile
+from typing import Any, BinaryIO, Dict, Optional, Set, Tuple
 from fastapi import UploadFile
 
 from app.strategies.ingest_strategy import IngestStrategy
 from app.domain.entities import User, Plan
 from app.infra.event_bus import get_event_bus
 from app.domain.events import PdfIngestStartedEvent
-from app.infra.job_repository import JobRepository
+from app.infra.job_repository import get_job_repository
 from app.infra.pdf_storage import PdfStorage
 from app.config import settings
-from pymongo import MongoClient
+from app.infra.mongo_client import get_mongo_client
 
 logger = logging.getLogger(__name__)
 
+# Tamaño de bloque al copiar el upload a disco (1 MiB)
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+# Extensión y firma (magic bytes) aceptadas para los uploads
+PDF_EXTENSION = ".pdf"
+PDF_MAGIC = b"%PDF"
+
+# Referencias fuertes a las tareas en background: el event loop solo guarda
+# referencias débiles y una tarea sin referencia puede ser recolectada a medias
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _spool_to_tempfile(
+    source: BinaryIO,
+    max_bytes: Optional[int] = None,
+) -> Tuple[str, int, str]:
+    """
+    Copiar el archivo subido a un temporal propio, por bloques.
+    
+    El UploadFile se cierra al terminar el request, pero el guardado en GridFS
+    corre después en background: el temporal le sobrevive sin tener el PDF
+    completo en memoria. Tamaño y SHA-256 se calculan durante la copia.
+    
+    Args:
+        source: Archivo binario del upload (UploadFile.file)
+        max_bytes: Límite de tamaño (corta la copia apenas se excede)
+    
+    Returns:
+        (ruta del temporal, tamaño en bytes, SHA-256 del contenido)
+    
+    Raises:
+        ValueError: Si el archivo no es un PDF (magic bytes) o supera max_bytes
+    """
+    source.seek(0)
+    digest = hashlib.sha256()
+    size_bytes = 0
+    
+    # Un único buffer reutilizado (readinto): sin asignar bytes nuevos por bloque.
+    # Escrituras de 1 MiB superan el buffer del archivo y van directo a write()
+    buffer = bytearray(SPOOL_CHUNK_SIZE)
+    view = memoryview(buffer)
+    
+    tmp = tempfile.NamedTemporaryFile(prefix="sonqo_pdf_", suffix=".pdf", delete=False)
+    try:
+        with tmp:
+            while n := source.readinto(buffer):
+                # La firma se verifica sobre el primer bloque, en la misma pasada
+                if size_bytes == 0 and view[:len(PDF_MAGIC)] != PDF_MAGIC:
+                    raise ValueError("Invalid PDF file: missing %PDF header")
+                size_bytes += n
+                if max_bytes is not None and size_bytes > max_bytes:
+                    raise ValueError(
+                        f"PDF too large: exceeds plan limit of {max_bytes / (1024 * 1024):.0f}MB"
+                    )
+                digest.update(view[:n])
+                tmp.write(view[:n])
+        if size_bytes == 0:
+            raise ValueError("Invalid PDF file: file is empty")
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+    
+    return tmp.name, size_bytes, digest.hexdigest()
+
+
+def _measure_size(source: BinaryIO) -> int:
+    """Tamaño del archivo sin leerlo (seek al final)"""
+    size_bytes = source.seek(0, os.SEEK_END)
+    source.seek(0)
+    return size_bytes
+
 
 class PdfIngestStrategy(IngestStrategy):
     """
@@ -25,7 +99,7 @@ class PdfIngestStrategy(IngestStrategy):
     
     Optimización de Memoria:
     1. Guarda PDF en GridFS ANTES de publicar evento
-    2. Libera pdf_bytes inmediatamente
+    2. El upload se copia a disco por bloques: el PDF nunca está entero en RAM
     3. Evento NO contiene pdf_bytes (solo job_id)
     4. Listener lee de GridFS cuando necesita
     
@@ -36,20 +110,27 @@ class PdfIngestStrategy(IngestStrategy):
         self.event_bus = get_event_bus()
         
         # Inicializar dependencias
-        client = MongoClient(settings.mongo_uri)
+        client = get_mongo_client()
         meta_db = client[settings.mongo_meta_db]
         
-        self.job_repo = JobRepository()
+        self.job_repo = get_job_repository()
         self.pdf_storage = PdfStorage(meta_db)
     
     async def validate(self, user: User, plan: Plan, source: UploadFile) -> None:
-        """Validar tamaño del PDF"""
+        """
+        Validar nombre y tamaño del PDF (sin leer el contenido).
+        
+        La firma %PDF y el límite de tamaño real se verifican en `process`,
+        durante la única pasada que copia el upload a disco.
+        """
+        _, extension = os.path.splitext(source.filename or "")
+        if extension.lower() != PDF_EXTENSION:
+            raise ValueError("Only PDF files are supported. Filename must end with .pdf")
+        
         if hasattr(source, 'size') and source.size:
             size_bytes = source.size
         else:
-            content = await source.read()
-            size_bytes = len(content)
-            await source.seek(0)
+            size_bytes = await asyncio.to_thread(_measure_size, source.file)
         
         size_mb = size_bytes / (1024 * 1024)
         
@@ -81,34 +162,42 @@ class PdfIngestStrategy(IngestStrategy):
         doc_id = self._generate_document_id(document_id)
         plan_name = plan.name if plan else "Free"
         
-        # 1. Leer PDF (~100ms)
-        pdf_bytes = await source.read()
-        size_bytes = len(pdf_bytes)
+        # 1. Copiar PDF a un temporal por bloques (sin cargarlo entero en memoria)
+        max_bytes = plan.pdf_max_size_mb * 1024 * 1024 if plan else None
+        pdf_path, size_bytes, content_hash = await asyncio.to_thread(
+            _spool_to_tempfile, source.file, max_bytes
+        )
         
-        logger.info(f"📄 PDF read: job_id={job_id}, size={size_bytes/1024:.2f}KB")
+        logger.info(f"📄 PDF spooled: job_id={job_id}, size={size_bytes/1024:.2f}KB")
         
-        # 2. Crear job (~50ms)
-        self.job_repo.create(
-            job_id=job_id,
-            user_id=user_id,
-            project_id=project_id,
-            collection_name=collection,
-            job_type="pdf_ingest",
-            metadata={
-                "filename": source.filename,
-                "size_bytes": size_bytes,
-                "chunk_size": chunk_size,
-                "document_id": doc_id,
-                "plan_name": plan_name,
-                "user_metadata": metadata or {}
-            }
-        )
+        # 2. Crear job (~50ms, pymongo síncrono: fuera del event loop)
+        try:
+            await asyncio.to_thread(
+                self.job_repo.create,
+                job_id=job_id,
+                user_id=user_id,
+                project_id=project_id,
+                collection_name=collection,
+                job_type="pdf_ingest",
+                metadata={
+                    "filename": source.filename,
+                    "size_bytes": size_bytes,
+                    "chunk_size": chunk_size,
+                    "document_id": doc_id,
+                    "plan_name": plan_name,
+                    "user_metadata": metadata or {}
+                }
+            )
+        except BaseException:
+            os.unlink(pdf_path)
+            raise
         
         # 3. Publicar evento INMEDIATAMENTE (fire-and-forget)
-        asyncio.create_task(
+        task = asyncio.create_task(
             self._process_pdf_background(
                 job_id=job_id,
-                pdf_bytes=pdf_bytes,
+                pdf_path=pdf_path,
+                content_hash=content_hash,
                 plan_name=plan_name,
                 user_id=user_id,
                 project_id=project_id,
@@ -117,6 +206,8 @@ class PdfIngestStrategy(IngestStrategy):
                 filename=source.filename
             )
         )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
         
         logger.info(f"✅ PDF ingest queued: job_id={job_id}")
         
@@ -126,7 +217,8 @@ class PdfIngestStrategy(IngestStrategy):
     async def _process_pdf_background(
         self,
         job_id: str,
-        pdf_bytes: bytes,
+        pdf_path: str,
+        content_hash: str,
         plan_name: str,
         user_id: str,
         project_id: str,
@@ -136,16 +228,18 @@ class PdfIngestStrategy(IngestStrategy):
     ):
         """
         Procesar PDF en background:
-        1. Guardar en GridFS
+        1. Guardar en GridFS (streaming desde el temporal)
         2. Publicar evento PdfSavedToGridFSEvent (event-driven puro)
-        3. Liberar memoria
+        3. Eliminar el temporal
         """
         try:
             # 1. Guardar en GridFS
             logger.info(f"💾 Saving PDF to GridFS (background): job_id={job_id}")
             
-            content_hash = await self.pdf_storage.save_or_reuse(
-                pdf_bytes=pdf_bytes,
+            await self.pdf_storage.save_from_path(
+                pdf_path=pdf_path,
+                content_hash=content_hash,
+                size_bytes=size_bytes,
                 metadata={"job_id": job_id, "plan_name": plan_name}
             )
             
@@ -166,12 +260,12 @@ class PdfIngestStrategy(IngestStrategy):
             
             logger.info(f"📤 PdfSavedToGridFSEvent published: job_id={job_id}")
             
-            # 3. Liberar memoria (PDF ya está en GridFS)
-            del pdf_bytes
-            import gc
-            gc.collect()
-            logger.info(f"🗑️  PDF memory released: job_id={job_id}")
-            
         except Exception as e:
             logger.error(f"❌ Background processing failed: {e}")
-            self.job_repo.update_status(job_id, "failed", error=str(e))
+            await asyncio.to_thread(self.job_repo.update_status, job_id, "failed", error=str(e))
+        finally:
+            # 3. El PDF ya está en GridFS (o el job falló): el temporal sobra
+            try:
+                os.unlink(pdf_path)
+            except OSError:
+                pass
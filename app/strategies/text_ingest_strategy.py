@@ -2,6 +2,7 @@
 Strategy para ingesta de texto plano.
 Refactorizado para usar pipeline asíncrono con jobs.
 """
+import asyncio
 import logging
 from typing import Any, Dict, Optional
 
@@ -68,7 +69,7 @@ class TextIngestStrategy(IngestStrategy):
         Returns:
             job_id: ID del trabajo
         """
-        from app.infra.job_repository import JobRepository
+        from app.infra.job_repository import get_job_repository
         from app.infra.event_bus import get_event_bus
         from app.domain.events import TextIngestStartedEvent
         
@@ -82,8 +83,9 @@ class TextIngestStrategy(IngestStrategy):
         logger.info(f"📝 Text ingest starting: job_id={job_id}, size={text_size_bytes} bytes")
         
         # 1. Crear job
-        job_repo = JobRepository()
-        job_repo.create(
+        job_repo = get_job_repository()
+        await asyncio.to_thread(
+            job_repo.create,
             job_id=job_id,
             user_id=user_id,
             project_id=project_id,
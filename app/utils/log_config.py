@@ -0,0 +1,38 @@
+"""
+Configuración de logging de la aplicación.
+Los handlers de los requests solo encolan el registro; el formateo y la
+escritura a stderr ocurren en el thread de un QueueListener.
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Configurar el root logger una sola vez (idempotente).
+
+    Args:
+        level: Nivel del root logger (DEBUG habilita los logs de payloads)
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
@@ -2,6 +2,7 @@
 Script simple para probar el envío de correos SMTP.
 Usa la configuración actual de .env
 """
+import asyncio
 import sys
 import os
 import logging
@@ -16,6 +17,17 @@ from app.infra.email_service import EmailService
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+async def _send(service: EmailService, recipient: str) -> bool:
+    """Enviar el OTP de prueba y cerrar la sesión SMTP antes de salir del loop"""
+    try:
+        return await service.send_otp_email(
+            to_email=recipient,
+            otp_code="123456",
+            user_name="Test User"
+        )
+    finally:
+        await service.close()
+
 def test_email():
     settings = get_settings()
     print(f"📧 Probando configuración SMTP:")
@@ -28,11 +40,7 @@ def test_email():
     print(f"\n🚀 Intentando enviar correo de prueba a: {recipient}...")
     
     service = EmailService()
-    success = service.send_otp_email(
-        to_email=recipient,
-        otp_code="123456",
-        user_name="Test User"
-    )
+    success = asyncio.run(_send(service, recipient))
     
     if success:
         print("\n✅ ¡Correo enviado exitosamente! Revisa tu bandeja de entrada (y spam).")